@@ -0,0 +1,71 @@
+"""Synthetic Soundstripe JSON:API documents shaped like real /v1/songs responses."""
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List
+
+from search_orchestration.adapters.ai.taxonomy import MUSIC_TAXONOMY
+
+
+def make_songs_document(n_songs: int = 100, *, seed: int = 7, audio_files_per_song: int = 4) -> Dict[str, Any]:
+    """A songs list document with `n_songs` songs, their artists and audio files in `included`."""
+    rng = random.Random(seed)
+    data: List[Dict[str, Any]] = []
+    artists: Dict[str, Dict[str, Any]] = {}
+    audio_files: List[Dict[str, Any]] = []
+
+    for i in range(n_songs):
+        song_id = str(100000 + i)
+        artist_id = str(rng.randint(1, max(1, n_songs // 3)))
+        audio_ids = [f"{song_id}-{j}" for j in range(audio_files_per_song)]
+        data.append({
+            "id": song_id,
+            "type": "songs",
+            "attributes": {
+                "title": f"Track {i}",
+                "bpm": rng.randint(60, 180),
+                "energy": rng.choice(["low", "medium", "high"]),
+                "description": "A " + " ".join(rng.choice(MUSIC_TAXONOMY["characteristic"]) for _ in range(12)),
+                "tags": {
+                    category: rng.sample(terms, k=min(3, len(terms)))
+                    for category, terms in MUSIC_TAXONOMY.items()
+                },
+                "key": {"name": "C", "mode": "major"},
+                "explicit": False,
+            },
+            "relationships": {
+                "artists": {"data": [{"id": artist_id, "type": "artists"}]},
+                "audio_files": {"data": [{"id": a, "type": "audio_files"} for a in audio_ids]},
+            },
+            "links": {"self": f"https://api.soundstripe.com/v1/songs/{song_id}"},
+        })
+        artists.setdefault(artist_id, {
+            "id": artist_id,
+            "type": "artists",
+            "attributes": {
+                "name": f"Artist {artist_id}",
+                "image": f"https://cdn.example.com/artists/{artist_id}.jpg",
+                "bio": "Lorem ipsum " * 20,
+            },
+        })
+        for j, audio_id in enumerate(audio_ids):
+            audio_files.append({
+                "id": audio_id,
+                "type": "audio_files",
+                "attributes": {
+                    "description": "Full" if j == 0 else f"Alt {j}",
+                    "duration": rng.uniform(30, 300),
+                    "instrumental": j > 0,
+                    "versions": {
+                        fmt: f"https://cdn.example.com/audio/{audio_id}.{fmt}"
+                        for fmt in ("mp3", "wav", "aac", "hls")
+                    },
+                },
+            })
+
+    return {
+        "data": data,
+        "included": list(artists.values()) + audio_files,
+        "links": {"self": "https://api.soundstripe.com/v1/songs?page[number]=1", "next": "https://api.soundstripe.com/v1/songs?page[number]=2"},
+        "meta": {"total_count": n_songs * 10},
+    }
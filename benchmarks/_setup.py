@@ -0,0 +1,26 @@
+"""Standalone Django configuration for benchmark scripts (no .env or database server needed)."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Benchmarks never call the live API; the client only needs the variable to exist.
+os.environ.setdefault("SOUNDSTRIPE_API_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+if not settings.configured:
+    settings.configure(
+        OPENAI_API_KEY=os.environ["OPENAI_API_KEY"],
+        SOUNDSTRIPE_API_KEY=os.environ["SOUNDSTRIPE_API_KEY"],
+        SECRET_KEY="benchmark",
+        INSTALLED_APPS=["django.contrib.contenttypes", "search_orchestration"],
+        DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        USE_TZ=True,
+    )
+    django.setup()
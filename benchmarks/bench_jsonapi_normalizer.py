@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: decoding + flattening a 100-song Soundstripe response.
+
+Compares the original pipeline (json.loads, then mutating the decoded dicts key
+by key) with search_orchestration.clients.jsonapi (orjson decode + single-pass
+normalizer). Verifies both produce identical records before timing.
+
+Usage: python benchmarks/bench_jsonapi_normalizer.py [n_songs] [iterations]
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmarks._setup  # noqa: E402,F401
+from benchmarks._payloads import make_songs_document  # noqa: E402
+from search_orchestration.clients import jsonapi  # noqa: E402
+
+
+def legacy_flatten_songs(response):
+    """The flattening get_songs did inline before the jsonapi normalizer."""
+    if not response.get("data", []):
+        return response
+    if "included" not in response or not response["included"]:
+        response["data"] = response.get("data", [])
+        return response
+    artists_lookup = {}
+    audio_files_lookup = {}
+    for item in response["included"]:
+        if item["type"] == "artists":
+            artist_data = {"id": item["id"]}
+            if "attributes" in item:
+                artist_data.update(item["attributes"])
+            artists_lookup[item["id"]] = artist_data
+        elif item["type"] == "audio_files":
+            audio_file_data = {"id": item["id"]}
+            if "attributes" in item:
+                audio_file_data.update(item["attributes"])
+            audio_files_lookup[item["id"]] = audio_file_data
+    for song in response["data"]:
+        song["type"] = "song"
+        if "attributes" in song:
+            song.update(song["attributes"])
+            del song["attributes"]
+        if "relationships" in song and "artists" in song["relationships"]:
+            song["artists"] = [artists_lookup[r["id"]] for r in song["relationships"]["artists"]["data"]
+                               if r["id"] in artists_lookup]
+        if "relationships" in song and "audio_files" in song["relationships"]:
+            song["audio_files"] = [audio_files_lookup[r["id"]] for r in song["relationships"]["audio_files"]["data"]
+                                   if r["id"] in audio_files_lookup]
+        if "audio_files" in song and len(song["audio_files"]) > 0:
+            primary_audio_file = song["audio_files"][0]
+            if "versions" in primary_audio_file:
+                song["primary_audio"] = {}
+                if "mp3" in primary_audio_file["versions"]:
+                    song["primary_audio"]["mp3"] = primary_audio_file["versions"]["mp3"]
+                if "wav" in primary_audio_file["versions"]:
+                    song["primary_audio"]["wav"] = primary_audio_file["versions"]["wav"]
+                if "duration" in primary_audio_file:
+                    song["primary_audio"]["duration_s"] = int(round(primary_audio_file["duration"]))
+        if "relationships" in song:
+            del song["relationships"]
+    del response["included"]
+    return response
+
+
+def legacy(body: bytes):
+    return legacy_flatten_songs(json.loads(body))
+
+
+def current(body: bytes):
+    return jsonapi.normalize_songs(jsonapi.decode(body))
+
+
+def main():
+    n_songs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+    body = json.dumps(make_songs_document(n_songs)).encode()
+    assert legacy(body) == current(body), "normalizer output differs from legacy flattening"
+
+    print(f"Payload: {n_songs} songs, {len(body) / 1024:.0f} KiB, {iterations} iterations (best of 5)")
+    results = {}
+    for name, fn in (("legacy json.loads + in-place", legacy), ("orjson + jsonapi normalizer", current)):
+        best = min(timeit.repeat(lambda: fn(body), number=iterations, repeat=5)) / iterations
+        results[name] = best
+        print(f"  {name:<32} {best * 1000:8.3f} ms/response")
+
+    legacy_t, current_t = results.values()
+    print(f"Speedup: {legacy_t / current_t:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
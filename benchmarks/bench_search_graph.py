@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request setup cost of the orchestrated search stream.
+
+stream_orchestrated_search used to compile the LangGraph StateGraph and build
+a new streaming ChatOpenAI for every SSE request; it now reuses one compiled
+graph and one narration runnable per process (get_search_graph,
+get_explain_runnable). Times both, and reports the saving per
+request. Nothing is sent to OpenAI: only the setup is measured.
+
+Usage: python benchmarks/bench_search_graph.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmarks._setup  # noqa: E402,F401
+from search_orchestration.adapters.ai import llms  # noqa: E402
+from search_orchestration.adapters.ai.llm_search_orchestrator_v2 import (  # noqa: E402
+    build_search_graph,
+    get_explain_runnable,
+    get_search_graph,
+    make_explain_runnable,
+)
+
+
+def per_request_build():
+    """What every request did before: a fresh LLM client and a fresh compile."""
+    llms._explain_llm_streaming = None
+    make_explain_runnable()
+    return build_search_graph()
+
+
+def shared():
+    get_explain_runnable()
+    return get_search_graph()
+
+
+def timed(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    first = timed(shared, 1)  # includes the one-time compile
+    rebuilt = timed(per_request_build, iterations)
+    reused = timed(shared, iterations)
+
+    print(f"Search graph setup, {iterations} requests")
+    print(f"  compile per request   {rebuilt * 1000:9.3f} ms/request")
+    print(f"  shared compiled graph {reused * 1000:9.3f} ms/request "
+          f"(one-time build {first * 1000:.1f} ms)")
+    print(f"  saving                {(rebuilt - reused) * 1000:9.3f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
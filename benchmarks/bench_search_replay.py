@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: soundstripe_search end to end against a replayed Soundstripe API.
+
+Records a cassette once (from a synthetic upstream here; point
+SOUNDSTRIPE_TRANSPORT=record at the live API to capture real responses), then
+replays it through the pooled client with injected latency, jitter and error
+rate. Runs the same selections cold (empty cache) and warm, reporting p50/p95
+per search. Deterministic for a given seed; never touches the network.
+
+Usage: python benchmarks/bench_search_replay.py [latency_ms] [error_rate] [searches]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmarks._setup  # noqa: E402,F401
+import httpx  # noqa: E402
+import orjson  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+
+from benchmarks._payloads import make_songs_document  # noqa: E402
+from search_orchestration import catalog_index  # noqa: E402
+from search_orchestration.adapters.ai.taxonomy import MUSIC_TAXONOMY  # noqa: E402
+from search_orchestration.adapters.soundstripe_adapter import soundstripe_search  # noqa: E402
+from search_orchestration.clients import http_pool, resilience  # noqa: E402
+from search_orchestration.clients.replay import RecordingTransport, ReplayTransport  # noqa: E402
+from search_orchestration.result_cache import result_cache  # noqa: E402
+
+
+def synthetic_upstream(request: httpx.Request) -> httpx.Response:
+    """Stands in for the live API while recording."""
+    query = {k: v[0] for k, v in parse_qs(request.url.query.decode()).items()}
+    size = int(query.get("page[size]", 10))
+    seed = zlib.crc32(repr(sorted(query.items())).encode())
+    return httpx.Response(200, content=orjson.dumps(make_songs_document(size, seed=seed)))
+
+
+def selections(n: int):
+    genres, moods = MUSIC_TAXONOMY["genre"], MUSIC_TAXONOMY["mood"]
+    return [{"genre": [genres[i % len(genres)]], "mood": [moods[(i * 7) % len(moods)]]} for i in range(n)]
+
+
+def clear_caches():
+    cache.clear()
+    result_cache.clear()
+
+
+def run(label: str, searches):
+    timings = []
+    failures = 0
+    for selection in searches:
+        started = time.perf_counter()
+        try:
+            soundstripe_search(selection, page_size=50)
+        except httpx.HTTPError:
+            failures += 1
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"  {label:<6} p50 {statistics.median(timings) * 1000:8.1f} ms   "
+          f"p95 {p95 * 1000:8.1f} ms   failures {failures}/{len(timings)}")
+
+
+def main():
+    latency = (float(sys.argv[1]) if len(sys.argv) > 1 else 80.0) / 1000
+    error_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    n_searches = int(sys.argv[3]) if len(sys.argv) > 3 else 40
+
+    catalog_index.LOCAL_INDEX_ENABLED = False  # always exercise the API path
+    searches = selections(n_searches)
+
+    with tempfile.TemporaryDirectory() as cassette_dir:
+        http_pool.use_transport(RecordingTransport(
+            cassette_dir, transport=httpx.MockTransport(synthetic_upstream)))
+        clear_caches()
+        for selection in searches:
+            soundstripe_search(selection, page_size=50)
+        print(f"Recorded {len(os.listdir(cassette_dir))} responses; replaying with "
+              f"{latency * 1000:.0f} ms latency (+{latency * 500:.0f} ms jitter), "
+              f"{error_rate:.0%} injected errors, {n_searches} searches")
+
+        # Forget the recording run's (instant) latencies so hedging tracks the replay
+        resilience.latency = resilience.LatencyTracker()
+        http_pool.use_transport(ReplayTransport(
+            cassette_dir, latency=latency, jitter=latency / 2, error_rate=error_rate, seed=1))
+        clear_caches()
+        run("cold", searches)
+        run("warm", searches)
+        http_pool.use_transport(None)
+
+
+if __name__ == "__main__":
+    main()
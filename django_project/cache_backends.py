@@ -0,0 +1,235 @@
+"""
+SQLite-backed Django cache shared by every worker process on a node.
+
+LocMemCache gives each gunicorn worker its own private cache, so hit rates fall
+as workers are added. This backend keeps entries in one SQLite file (WAL mode,
+so readers never block each other or the writer) that all local processes open,
+with no external service to run. Size is bounded by MAX_ENTRIES and optionally
+MAX_SIZE_BYTES; when either is exceeded the least recently used entries are
+evicted. Triggers keep the entry count and total bytes in the one-row
+cache_meta table, in the same transaction as every change, so a write checks
+the bounds without scanning the table (whose rows carry the value BLOBs).
+
+Usage in settings.CACHES:
+
+    "default": {
+        "BACKEND": "django_project.cache_backends.SQLiteLRUCache",
+        "LOCATION": "/path/to/cache.sqlite3",
+        "OPTIONS": {"MAX_ENTRIES": 5000, "MAX_SIZE_BYTES": 256 * 1024 * 1024},
+    }
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# One transaction, so the meta row is computed (once, for files created before
+# it existed) consistently with the triggers that maintain it from then on.
+_SCHEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+DROP INDEX IF EXISTS cache_entries_accessed;
+-- Covers the LRU scan: eviction reads sizes without touching the rows
+CREATE INDEX IF NOT EXISTS cache_entries_accessed_size ON cache_entries (accessed, size);
+CREATE INDEX IF NOT EXISTS cache_entries_expires ON cache_entries (expires);
+CREATE TABLE IF NOT EXISTS cache_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS cache_entries_insert AFTER INSERT ON cache_entries BEGIN
+    UPDATE cache_meta SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_entries_delete AFTER DELETE ON cache_entries BEGIN
+    UPDATE cache_meta SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_entries_resize AFTER UPDATE OF size ON cache_entries BEGIN
+    UPDATE cache_meta SET bytes = bytes - OLD.size + NEW.size WHERE id = 1;
+END;
+-- (An aggregate always yields a row, hence OR IGNORE; the WHERE skips the scan)
+INSERT OR IGNORE INTO cache_meta (id, entries, bytes)
+    SELECT 1, COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries
+    WHERE NOT EXISTS (SELECT 1 FROM cache_meta);
+COMMIT;
+"""
+
+
+class SQLiteLRUCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = str(location)
+        options = params.get("OPTIONS", {})
+        self._max_size_bytes = options.get("MAX_SIZE_BYTES")
+        # Only rewrite an entry's LRU timestamp when it is older than this (seconds),
+        # so hot keys do not turn every read into a write.
+        self._touch_resolution = float(options.get("TOUCH_RESOLUTION", 1.0))
+        self._busy_timeout_ms = int(options.get("BUSY_TIMEOUT_MS", 5000))
+        self._local = threading.local()
+
+    # -----------------------------
+    # Connection handling
+    # -----------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread and process (connections never cross a fork)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(
+            self._path, timeout=self._busy_timeout_ms / 1000, isolation_level=None)
+        conn.execute(f"PRAGMA busy_timeout = {self._busy_timeout_ms}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        try:
+            conn.executescript(_SCHEMA)
+        except BaseException:
+            conn.close()  # rolls back, releasing the write lock
+            raise
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def close(self, **kwargs):
+        # Connections are per thread and reused across requests.
+        pass
+
+    # -----------------------------
+    # Cache API
+    # -----------------------------
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires, accessed FROM cache_entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return default
+
+        value, expires, accessed = row
+        now = time.time()
+        if expires is not None and expires <= now:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE key = ? AND expires <= ?", (key, now))
+            return default
+        if now - accessed >= self._touch_resolution:
+            conn.execute(
+                "UPDATE cache_entries SET accessed = ? WHERE key = ?", (now, key))
+        return pickle.loads(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._write(key, value, timeout, only_if_absent=False)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._write(key, value, timeout, only_if_absent=True)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        cursor = self._connection().execute(
+            "UPDATE cache_entries SET expires = ?, accessed = ? "
+            "WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (self.get_backend_timeout(timeout), now, key, now),
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._connection().execute(
+            "DELETE FROM cache_entries WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            "SELECT 1 FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return row is not None
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache_entries")
+
+    # -----------------------------
+    # Internals
+    # -----------------------------
+
+    def _write(self, key, value, timeout, *, only_if_absent: bool) -> bool:
+        blob = pickle.dumps(value, self.pickle_protocol)
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        conn = self._connection()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if only_if_absent:
+                row = conn.execute(
+                    "SELECT 1 FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)",
+                    (key, now),
+                ).fetchone()
+                if row is not None:
+                    conn.execute("COMMIT")
+                    return False
+            # An upsert rather than INSERT OR REPLACE: the implicit delete of a
+            # replaced row does not fire the triggers that maintain cache_meta
+            conn.execute(
+                "INSERT INTO cache_entries (key, value, expires, accessed, size) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "value = excluded.value, expires = excluded.expires, "
+                "accessed = excluded.accessed, size = excluded.size",
+                (key, blob, expires, now, len(blob)),
+            )
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def _totals(self, conn: sqlite3.Connection):
+        """(entry count, total value bytes), as maintained in cache_meta."""
+        return conn.execute("SELECT entries, bytes FROM cache_meta WHERE id = 1").fetchone()
+
+    def _within_bounds(self, count: int, total_size: int) -> bool:
+        return count <= self._max_entries and (
+            self._max_size_bytes is None or total_size <= self._max_size_bytes)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Once a bound is exceeded, drop expired entries, then least recently used ones."""
+        if self._within_bounds(*self._totals(conn)):
+            return
+
+        conn.execute(
+            "DELETE FROM cache_entries WHERE expires IS NOT NULL AND expires <= ?", (now,))
+        count, total_size = self._totals(conn)
+        if self._within_bounds(count, total_size):
+            return
+
+        # Victims by rowid, read from the (accessed, size) index alone
+        excess = max(0, count - self._max_entries)
+        over = 0 if self._max_size_bytes is None else max(0, total_size - self._max_size_bytes)
+        victims = []
+        freed = 0
+        for rowid, size in conn.execute(
+                "SELECT rowid, size FROM cache_entries ORDER BY accessed"):
+            if len(victims) >= excess and freed >= over:
+                break
+            victims.append((rowid,))
+            freed += size
+        conn.executemany("DELETE FROM cache_entries WHERE rowid = ?", victims)
@@ -138,11 +138,41 @@ else:
 
 # Cache configuration for django-cache-memoize
 # https://docs.djangoproject.com/en/dev/topics/cache/
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+# The SQLite-file backend is shared by every gunicorn worker on the node, so
+# cached API and LLM results are computed once per node rather than per worker.
+if env.bool("SHARED_CACHE", default=True):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_project.cache_backends.SQLiteLRUCache',
+            'LOCATION': env.str("CACHE_LOCATION", str(BASE_DIR / ".cache" / "django_cache.sqlite3")),
+            'TIMEOUT': 3600,
+            'OPTIONS': {
+                'MAX_ENTRIES': env.int("CACHE_MAX_ENTRIES", 20000),
+                'MAX_SIZE_BYTES': env.int("CACHE_MAX_SIZE_BYTES", 512 * 1024 * 1024),
+            },
+        },
+        # Memoized LLM taxonomy selections (search_orchestration.adapters.ai.selection_cache)
+        'selections': {
+            'BACKEND': 'django_project.cache_backends.SQLiteLRUCache',
+            'LOCATION': env.str("SELECTION_CACHE_LOCATION", str(BASE_DIR / ".cache" / "selections.sqlite3")),
+            'TIMEOUT': 7 * 24 * 3600,
+            'OPTIONS': {
+                'MAX_ENTRIES': env.int("SELECTION_CACHE_MAX_ENTRIES", 10000),
+                'MAX_SIZE_BYTES': env.int("SELECTION_CACHE_MAX_SIZE_BYTES", 16 * 1024 * 1024),
+            },
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'selections': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'selections',
+            'OPTIONS': {'MAX_ENTRIES': env.int("SELECTION_CACHE_MAX_ENTRIES", 10000)},
+        },
     }
-}
 
 # For Docker/PostgreSQL usage uncomment this and comment the DATABASES config above
 # DATABASES = {
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.test import SimpleTestCase
+
+from django_project.cache_backends import SQLiteLRUCache
+
+
+class SQLiteLRUCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.path = os.path.join(directory, "cache.sqlite3")
+
+    def make_cache(self, **options):
+        return SQLiteLRUCache(self.path, {"OPTIONS": {"TOUCH_RESOLUTION": 0, **options}})
+
+    def totals(self, cache):
+        conn = cache._connection()
+        meta = conn.execute("SELECT entries, bytes FROM cache_meta").fetchone()
+        actual = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+        self.assertEqual(meta, actual)
+        return meta
+
+    def test_meta_totals_follow_upsert_delete_expiry_and_clear(self):
+        cache = self.make_cache(MAX_ENTRIES=100)
+        cache.set("a", b"x" * 100)
+        cache.set("b", b"y" * 10)
+        entries, size = self.totals(cache)
+        self.assertEqual(entries, 2)
+
+        cache.set("a", b"x")  # upsert shrinks the entry
+        self.assertEqual(self.totals(cache), (2, size - 99))
+        self.assertFalse(cache.add("a", b"z"))
+        self.assertTrue(cache.delete("b"))
+        self.assertEqual(self.totals(cache)[0], 1)
+
+        cache.set("short", 1, timeout=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("short"))
+        self.assertEqual(self.totals(cache)[0], 1)
+
+        cache.clear()
+        self.assertEqual(self.totals(cache), (0, 0))
+
+    def test_evicts_least_recently_used_past_max_entries(self):
+        cache = self.make_cache(MAX_ENTRIES=3)
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+            time.sleep(0.002)
+        cache.get("a")  # now more recent than b and c
+        time.sleep(0.002)
+        cache.set("d", "d")
+
+        self.assertEqual([cache.get(key) for key in "abcd"], ["a", None, "c", "d"])
+        self.assertEqual(self.totals(cache)[0], 3)
+
+    def test_evicts_expired_entries_before_live_ones(self):
+        cache = self.make_cache(MAX_ENTRIES=2)
+        cache.set("live", 1)
+        time.sleep(0.002)
+        cache.set("expiring", 2, timeout=0.01)
+        time.sleep(0.02)
+        cache.set("new", 3)
+        self.assertEqual((cache.get("live"), cache.get("new")), (1, 3))
+        self.assertEqual(self.totals(cache)[0], 2)
+
+    def test_evicts_until_within_max_size_bytes(self):
+        cache = self.make_cache(MAX_ENTRIES=100, MAX_SIZE_BYTES=2500)
+        for key in ("a", "b", "c"):
+            cache.set(key, b"x" * 1000)
+            time.sleep(0.002)
+        entries, size = self.totals(cache)
+        self.assertEqual(entries, 2)
+        self.assertLessEqual(size, 2500)
+        self.assertIsNone(cache.get("a"))
+
+    def test_totals_computed_for_a_file_created_without_them(self):
+        cache = self.make_cache(MAX_ENTRIES=100)
+        cache.set("a", b"x" * 50)
+        cache.set("b", b"y" * 50)
+        conn = cache._connection()
+        for trigger in ("cache_entries_insert", "cache_entries_delete", "cache_entries_resize"):
+            conn.execute(f"DROP TRIGGER {trigger}")
+        conn.execute("DROP TABLE cache_meta")
+        conn.close()
+
+        reopened = self.make_cache(MAX_ENTRIES=100)
+        self.assertEqual(self.totals(reopened)[0], 2)
+        reopened.set("c", 1)
+        self.assertEqual(self.totals(reopened)[0], 3)
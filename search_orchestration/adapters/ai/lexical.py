@@ -0,0 +1,213 @@
+"""
+Deterministic fast path from user text to taxonomy terms.
+
+Many queries literally name taxonomy terms ("cinematic piano, hopeful"); for
+those the selection LLM adds a round trip and nothing else. match_selection
+tokenizes the query and scans it against a token trie holding every
+MUSIC_TAXONOMY term plus SYNONYMS, leftmost-longest ("acoustic guitar" is the
+instrument, not the genre Acoustic followed by Guitar).
+
+The result carries a confidence: the share of the query's content words
+(STOPWORDS aside) covered by matched terms. It is 0 when nothing matched,
+when the query negates something ("no vocals", "without drums"), or when it
+names more terms than one selection may hold (the validator would drop
+some). node_plan_round uses the selection directly at or above
+LEXICAL_MIN_CONFIDENCE and asks the LLM otherwise, so only genuinely
+ambiguous requests reach it.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from environs import Env
+
+from search_orchestration.adapters.ai.selection_cache import normalize_query
+from search_orchestration.adapters.ai.state import Selection
+from search_orchestration.adapters.ai.taxonomy import MUSIC_TAXONOMY
+from search_orchestration.adapters.ai.utils import MAX_TERMS_PER_SELECTION, validate_and_normalize_selections
+
+env = Env()
+env.read_env()
+
+# Confidence at which node_plan_round skips the selection LLM (above 1 disables the fast path)
+LEXICAL_MIN_CONFIDENCE = env.float("SEARCH_LEXICAL_CONFIDENCE", 0.8)
+
+# Other ways of saying a taxonomy term: phrase -> (category, term)
+SYNONYMS: Dict[str, Tuple[str, str]] = {
+    # genre
+    "8bit": ("genre", "8-Bit"),
+    "chiptune": ("genre", "8-Bit"),
+    "christmas": ("genre", "Holiday"),
+    "xmas": ("genre", "Holiday"),
+    "d&b": ("genre", "Drum & Bass"),
+    "dnb": ("genre", "Drum & Bass"),
+    "drum and bass": ("genre", "Drum & Bass"),
+    "dixieland": ("genre", "New Orleans / Dixieland"),
+    "dubstep": ("genre", "Dub Step"),
+    "electronica": ("genre", "Electronic"),
+    "film score": ("genre", "Score"),
+    "hiphop": ("genre", "Hip Hop"),
+    "lofi": ("genre", "Lo-Fi"),
+    "motown": ("genre", "Soul / Motown"),
+    "orchestra": ("genre", "Orchestral"),
+    "r and b": ("genre", "R&B"),
+    "rnb": ("genre", "R&B"),
+    "retrowave": ("genre", "Synthwave"),
+    "soul": ("genre", "Soul / Motown"),
+    "soundtrack": ("genre", "Soundtrack / Cinematic"),
+    # instrument
+    "brass": ("instrument", "Horns"),
+    "clarinet": ("instrument", "Woodwinds"),
+    "claps": ("instrument", "Claps / Snaps / Stomps"),
+    "drum": ("instrument", "Drums"),
+    "electric piano": ("instrument", "Rhodes"),
+    "fiddle": ("instrument", "Violin"),
+    "flute": ("instrument", "Woodwinds"),
+    "handclaps": ("instrument", "Claps / Snaps / Stomps"),
+    "mallets": ("instrument", "Xylophone / Mallets"),
+    "marimba": ("instrument", "Xylophone / Mallets"),
+    "sax": ("instrument", "Saxophone"),
+    "snaps": ("instrument", "Claps / Snaps / Stomps"),
+    "stomps": ("instrument", "Claps / Snaps / Stomps"),
+    "synthesizer": ("instrument", "Synth"),
+    "uke": ("instrument", "Ukulele"),
+    "vibraphone": ("instrument", "Xylophone / Mallets"),
+    "whistle": ("instrument", "Whistling"),
+    "xylophone": ("instrument", "Xylophone / Mallets"),
+    # characteristic
+    "atmosphere": ("characteristic", "Atmospheric"),
+    "danceable": ("characteristic", "Dancey"),
+    "dancy": ("characteristic", "Dancey"),
+    "energetic": ("characteristic", "Upbeat"),
+    "minimalist": ("characteristic", "Minimal"),
+    "up tempo": ("characteristic", "Upbeat"),
+    "uptempo": ("characteristic", "Upbeat"),
+    "vintage": ("characteristic", "Retro"),
+    # mood
+    "cheerful": ("mood", "Happy"),
+    "chilled": ("mood", "Chill"),
+    "chillout": ("mood", "Chill"),
+    "creepy": ("mood", "Scary"),
+    "horror": ("mood", "Scary"),
+    "inspirational": ("mood", "Inspiring"),
+    "joyful": ("mood", "Happy"),
+    "laid back": ("mood", "Chill"),
+    "melancholic": ("mood", "Sad"),
+    "melancholy": ("mood", "Sad"),
+    "motivational": ("mood", "Inspiring"),
+    "nostalgic": ("mood", "Reflective"),
+    "peaceful": ("mood", "Calm"),
+    "relaxed": ("mood", "Calm"),
+    "relaxing": ("mood", "Calm"),
+    "romance": ("mood", "Romantic"),
+    "serene": ("mood", "Calm"),
+    "spooky": ("mood", "Scary"),
+    "suspense": ("mood", "Suspenseful"),
+    "tense": ("mood", "Suspenseful"),
+    "uplifting": ("mood", "Inspiring"),
+    "whimsical": ("mood", "Quirky"),
+}
+
+# Words that carry no taxonomy meaning; they neither match nor lower confidence
+STOPWORDS = frozenset("""
+    a an and any for i in into is it its like me music my need of on or our please
+    some something song songs sound sounds style that the to track tracks tune tunes
+    very vibe vibes vibey want we with feel feeling kind looking type beat beats
+""".split())
+
+# Queries that exclude something need the LLM
+NEGATIONS = frozenset("no not without except avoid less non".split())
+
+_TERMINAL = ""
+
+
+def _tokens(text: str) -> List[str]:
+    return normalize_query(text).split()
+
+
+def _phrases() -> List[Tuple[str, str, str]]:
+    """(phrase, category, term) for every taxonomy term, synonym and instrument plural."""
+    phrases = []
+    for category, terms in MUSIC_TAXONOMY.items():
+        for term in terms:
+            phrases.append((term, category, term))
+            if category == "instrument" and " " not in term and not term.endswith("s"):
+                phrases.append((f"{term}s", category, term))
+    for phrase, (category, term) in SYNONYMS.items():
+        if term in MUSIC_TAXONOMY.get(category, ()):
+            phrases.append((phrase, category, term))
+    return phrases
+
+
+def _build_trie() -> Dict[str, Any]:
+    """Nested dicts keyed by token; _TERMINAL holds the (category, term) a path spells."""
+    trie: Dict[str, Any] = {}
+    for phrase, category, term in _phrases():
+        node = trie
+        for token in _tokens(phrase):
+            node = node.setdefault(token, {})
+        node.setdefault(_TERMINAL, (category, term))
+    return trie
+
+
+_TRIE = _build_trie()
+
+
+@dataclass(frozen=True)
+class LexicalMatch:
+    selection: Selection
+    confidence: float
+    # Content words no term accounted for
+    unmatched: Tuple[str, ...] = field(default=())
+
+
+def _scan(tokens: List[str]) -> Tuple[List[Tuple[str, str]], List[bool]]:
+    """Leftmost-longest matches, and which tokens they cover."""
+    matches: List[Tuple[str, str]] = []
+    covered = [False] * len(tokens)
+    i = 0
+    while i < len(tokens):
+        node, longest, end = _TRIE, None, i
+        for j in range(i, len(tokens)):
+            node = node.get(tokens[j])
+            if node is None:
+                break
+            if _TERMINAL in node:
+                longest, end = node[_TERMINAL], j + 1
+        if longest is None:
+            i += 1
+            continue
+        matches.append(longest)
+        covered[i:end] = [True] * (end - i)
+        i = end
+    return matches, covered
+
+
+def match_selection(user_text: str) -> LexicalMatch:
+    """The Selection the query's taxonomy terms spell out, with a 0-1 confidence."""
+    tokens = _tokens(user_text)
+    matches, covered = _scan(tokens)
+
+    selection: Selection = {}
+    for category in MUSIC_TAXONOMY:
+        terms = [term for matched_category, term in matches if matched_category == category]
+        if terms:
+            selection[category] = list(dict.fromkeys(terms))
+
+    unmatched = tuple(
+        token for token, hit in zip(tokens, covered) if not hit and token not in STOPWORDS)
+    content = sum(1 for token, hit in zip(tokens, covered) if hit or token not in STOPWORDS)
+    too_many = sum(len(terms) for terms in selection.values()) > MAX_TERMS_PER_SELECTION
+    if not selection or not content or too_many or NEGATIONS.intersection(tokens):
+        return LexicalMatch(selection=selection, confidence=0.0, unmatched=unmatched)
+    return LexicalMatch(
+        selection=selection, confidence=1.0 - len(unmatched) / content, unmatched=unmatched)
+
+
+def lexical_selections(user_text: str) -> Optional[List[Selection]]:
+    """[selection] when the query is confidently matched lexically, else None."""
+    match = match_selection(user_text)
+    if match.confidence < LEXICAL_MIN_CONFIDENCE:
+        return None
+    return validate_and_normalize_selections([match.selection])
@@ -1,8 +1,13 @@
 from __future__ import annotations
+import queue
+import threading
 import time
 import json
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Any, Callable, Dict, Generator, List, Optional, Set, Tuple
 
+from django.db import connections
 from langchain_core.messages import BaseMessage
 from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
@@ -17,14 +22,25 @@ from search_orchestration.adapters.ai.prompts import (
     get_selection_instruction,
 )
 from search_orchestration.adapters.ai.prompts.explain import EXPLAIN_PROMPTS
+from search_orchestration.adapters.ai.lexical import lexical_selections
+from search_orchestration.adapters.ai.ranking import rank_songs
+from search_orchestration.adapters.ai.selection_cache import memoized_selections
 from search_orchestration.adapters.ai.utils import merge_selection_into, song_to_context_item, format_filters_summary, validate_and_normalize_selections
 from search_orchestration.adapters.ai.state import Selection, SearchState
 from search_orchestration.adapters.ai.taxonomy import MUSIC_TAXONOMY
-from search_orchestration.adapters.soundstripe_adapter import soundstripe_search
+from search_orchestration.adapters.soundstripe_adapter import reciprocal_rank_fusion, soundstripe_search_many
+from search_orchestration.clients.soundstripe_client import MAX_PAGE_SIZE
+from search_orchestration.songs import Song
 
 # Defaults for search loop
 DEFAULT_MIN_RESULTS = 20
 DEFAULT_MAX_ROUNDS = 3
+# Off by default: it costs an extra LLM call whenever round one is enough
+DEFAULT_SPECULATIVE_BROADEN = False
+# How long round two waits for a running speculative call before calling the LLM itself
+SPECULATIVE_WAIT_SECONDS = 3.0
+# Upper bound on songs requested per query in one round (later rounds escalate towards it)
+MAX_FETCH_PER_QUERY = 4 * MAX_PAGE_SIZE
 TAXONOMY_JSON = json.dumps(MUSIC_TAXONOMY, ensure_ascii=False, indent=2)
 SELECTION_PROMPT = get_selection_prompt()
 
@@ -38,7 +54,25 @@ def generate_search_selections(
     """
     Generate taxonomy selections from user text using structured LLM + prompt template.
     Returns a list of selection dicts (validated and normalized).
+
+    Repeat queries are answered from the selection cache without calling the
+    LLM (see selection_cache).
     """
+    return memoized_selections(
+        user_text,
+        broaden=broaden,
+        prior_counts=prior_counts,
+        generate=lambda: _llm_search_selections(
+            user_text, broaden=broaden, prior_counts=prior_counts),
+    )
+
+
+def _llm_search_selections(
+    user_text: str,
+    *,
+    broaden: bool,
+    prior_counts: List[int],
+) -> List[Dict[str, Any]]:
     instruction = get_selection_instruction(
         broaden=broaden, prior_counts=prior_counts)
 
@@ -58,6 +92,53 @@ def generate_search_selections(
     return validate_and_normalize_selections(raw)
 
 
+_speculation_pool: Optional[ThreadPoolExecutor] = None
+_speculation_pool_lock = threading.Lock()
+
+
+def _get_speculation_pool() -> ThreadPoolExecutor:
+    global _speculation_pool
+    with _speculation_pool_lock:
+        if _speculation_pool is None:
+            _speculation_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="search-speculation")
+        return _speculation_pool
+
+
+def _reset_after_fork() -> None:
+    # The parent's speculation threads do not exist in the child
+    global _speculation_pool, _speculation_pool_lock
+    _speculation_pool = None
+    _speculation_pool_lock = threading.Lock()
+
+
+def _speculate_broadened(user_text: str) -> Future:
+    """
+    Start round two's broadened selection call now, while round one searches.
+    Round one's result count is not known yet, so the call goes without it.
+    """
+    return _get_speculation_pool().submit(
+        generate_search_selections, user_text, broaden=True, prior_counts=[])
+
+
+def _speculative_result(speculative: Future) -> Optional[List[Dict[str, Any]]]:
+    """
+    The speculative selections, or None to make the call directly: when the
+    speculation is still queued behind other requests' (it is cancelled), does
+    not finish within SPECULATIVE_WAIT_SECONDS, or failed.
+    """
+    if speculative.cancel():
+        print('speculative selection still queued; calling directly')
+        return None
+    try:
+        return speculative.result(timeout=SPECULATIVE_WAIT_SECONDS) or None
+    except FutureTimeoutError:
+        print(f'speculative selection not ready after {SPECULATIVE_WAIT_SECONDS}s; calling directly')
+        return None
+    except Exception as e:
+        print(f"Speculative selection error: {e}")
+        return None
+
+
 def _build_explain_prompt_messages(state: SearchState) -> List[BaseMessage]:
     key = state.get("explain_key") or "finish"
     ctx = state.get("explain_ctx") or {}
@@ -142,22 +223,45 @@ def node_plan_round(state: SearchState) -> Dict[str, Any]:
             "seen_ids": [],
         }
 
-    try:
-        valid = generate_search_selections(
-            user_text,
-            broaden=broaden,
-            prior_counts=state.get("prior_counts") or [],
-        )
-    except Exception as e:
-        print(f"Selection validation error: {e}")
-        valid = []
+    speculative: Optional[Future] = state.get("speculative_selections")
+    valid: Optional[List[Dict[str, Any]]] = None
+    if broaden:
+        if speculative is not None:
+            valid = _speculative_result(speculative)
+            if valid is not None:
+                print('using speculative broadened selections')
+    else:
+        # Queries that plainly name taxonomy terms skip the LLM
+        valid = lexical_selections(user_text)
+        if valid is not None:
+            print('using lexical selections', valid)
+    if valid is None:
+        try:
+            valid = generate_search_selections(
+                user_text,
+                broaden=broaden,
+                prior_counts=state.get("prior_counts") or [],
+            )
+        except Exception as e:
+            print(f"Selection validation error: {e}")
+            valid = []
 
     merged: Selection = {}
     for sel in valid:
         merge_selection_into(merged, sel)
 
+    update: Dict[str, Any] = {}
+    if is_first_round:
+        update["target_selection"] = merged
+        if state.get("speculative_broaden") and int(state.get("max_rounds", DEFAULT_MAX_ROUNDS)) > 1:
+            update["speculative_selections"] = _speculate_broadened(user_text)
+    elif speculative is not None:
+        update["speculative_selections"] = None
+
     return {
+        **update,
         "merged_selection": merged,
+        "selections": valid,
         "explain_key": "plan_round",
         "explain_ctx": {
             "broaden": broaden,
@@ -166,23 +270,62 @@ def node_plan_round(state: SearchState) -> Dict[str, Any]:
     }
 
 
+def _round_queries(merged: Selection, selections: List[Selection]) -> List[Selection]:
+    """The merged selection plus each individual one, without empty or duplicate queries."""
+    queries: List[Selection] = []
+    seen: Set[str] = set()
+    for selection in [merged, *selections]:
+        key = json.dumps({k: sorted(v) for k, v in selection.items() if v}, sort_keys=True)
+        if key == "{}" or key in seen:
+            continue
+        seen.add(key)
+        queries.append(selection)
+    return queries or [merged]
+
+
+def _fetch_size(state: SearchState) -> int:
+    """
+    How many songs to request per query this round: the remaining deficit.
+
+    Round 0 asks for exactly what is missing. A later round only runs because
+    _should_continue said "loop", and its top hits overlap songs already seen,
+    so each further round doubles the request to dig deeper.
+    """
+    min_results = int(state.get("min_results", DEFAULT_MIN_RESULTS))
+    round_idx = int(state.get("round_idx", 0))
+    deficit = max(1, min_results - len(state.get("results") or []))
+    return min(deficit * (2 ** round_idx), MAX_FETCH_PER_QUERY)
+
+
 def node_soundstripe_search(state: SearchState) -> Dict[str, Any]:
     writer = get_stream_writer()
     merged: Selection = state.get("merged_selection") or {}
-    songs: List[Dict[str, Any]] = soundstripe_search(merged)
+    fetch_size = _fetch_size(state)
+
+    # The merged selection is the most constrained query; searching each
+    # selection alongside it (in parallel) and fusing the rankings reaches
+    # min_results in fewer rounds.
+    queries = _round_queries(merged, state.get("selections") or [])
+    rankings = soundstripe_search_many(
+        queries, page_size=min(fetch_size, MAX_PAGE_SIZE), limit=fetch_size)
+    songs: List[Song] = reciprocal_rank_fusion(rankings)
 
-    results: List[Dict[str, Any]] = list(state.get("results") or [])
+    results: List[Song] = list(state.get("results") or [])
     seen_ids_set: Set[str] = set(state.get("seen_ids") or [])
 
-    new_songs: List[Dict[str, Any]] = []
+    new_songs: List[Song] = []
     for song in songs:
-        sid = str(song.get("id") or "")
+        sid = song.id
         if not sid or sid in seen_ids_set:
             continue
         seen_ids_set.add(sid)
-        results.append(song)
         new_songs.append(song)
 
+    # Best-first against the user's original intent, so broadened rounds
+    # do not push loosely matching songs ahead of close ones
+    new_songs = rank_songs(new_songs, state.get("target_selection") or merged)
+    results.extend(new_songs)
+
     if new_songs:
         _emit(
             writer,
@@ -245,9 +388,15 @@ def _should_continue(state: SearchState) -> str:
 
 def node_finish(state: SearchState) -> Dict[str, Any]:
 
+    # Round one was enough: the speculative broadened selection is not needed
+    speculative: Optional[Future] = state.get("speculative_selections")
+    if speculative is not None:
+        speculative.cancel()
+
     results = state.get("results") or []
     return {
         **state,
+        "speculative_selections": None,
         "explain_key": "finish",
         "explain_ctx": {
             "total_results": len(results),
@@ -256,41 +405,29 @@ def node_finish(state: SearchState) -> Dict[str, Any]:
 
 
 def build_search_graph() -> Any:
-    g: StateGraph[SearchState] = StateGraph(SearchState)
-
-    explain = make_explain_runnable()
+    """
+    The search pipeline: plan_round -> soundstripe_search -> record_debug,
+    looping until _should_continue says "finish".
 
-    # Wrap explain runnable to write into state["messages"] so add_messages can collect it
-    def explain_node(state: SearchState) -> Dict[str, Any]:
-        # streams chunks via stream_mode="messages"
-        msg = explain.invoke(state)
-        return {"messages": [msg]}
+    Narration is not part of the graph: every node leaves an explain_key /
+    explain_ctx in its update, and stream_orchestrated_search narrates those
+    in the background, so no step ever waits on an explanation.
+    """
+    g: StateGraph[SearchState] = StateGraph(SearchState)
 
     # Register nodes
     g.add_node("plan_round", node_plan_round)
-    g.add_node("plan_round_explain", explain_node)
-
     g.add_node("soundstripe_search", node_soundstripe_search)
-    g.add_node("soundstripe_search_explain", explain_node)
-
     g.add_node("record_debug", node_record_debug)
-    g.add_node("record_debug_explain", explain_node)
-
     g.add_node("finish", node_finish)
-    g.add_node("finish_explain", explain_node)
 
     # Flow
     g.add_edge(START, "plan_round")
-    g.add_edge("plan_round", "plan_round_explain")
-    g.add_edge("plan_round_explain", "soundstripe_search")
-
-    g.add_edge("soundstripe_search", "soundstripe_search_explain")
-    g.add_edge("soundstripe_search_explain", "record_debug")
-
-    g.add_edge("record_debug", "record_debug_explain")
+    g.add_edge("plan_round", "soundstripe_search")
+    g.add_edge("soundstripe_search", "record_debug")
 
     g.add_conditional_edges(
-        "record_debug_explain",
+        "record_debug",
         _should_continue,
         {
             "loop": "plan_round",
@@ -298,17 +435,105 @@ def build_search_graph() -> Any:
         },
     )
 
-    g.add_edge("finish", "finish_explain")
-    g.add_edge("finish_explain", END)
+    g.add_edge("finish", END)
 
     return g.compile()
 
 
+_search_graph = None
+_explain_runnable = None
+_search_graph_lock = threading.Lock()
+
+
+def get_search_graph() -> Any:
+    """
+    The compiled search graph, built on first use and shared by every request.
+
+    A compiled graph keeps no per-run state (each stream() gets its own), so
+    concurrent streams can use it safely.
+    """
+    global _search_graph
+    if _search_graph is None:
+        with _search_graph_lock:
+            if _search_graph is None:
+                _search_graph = build_search_graph()
+    return _search_graph
+
+
+def get_explain_runnable():
+    """The narration runnable (see make_explain_runnable), shared like the graph."""
+    global _explain_runnable
+    if _explain_runnable is None:
+        with _search_graph_lock:
+            if _explain_runnable is None:
+                _explain_runnable = make_explain_runnable()
+    return _explain_runnable
+
+
+# Queue items that end a stream's producers
+_GRAPH_DONE = object()
+_NARRATION_DONE = object()
+
+
+def _narrate(snapshot: Dict[str, Any], out: "queue.Queue", stop: threading.Event) -> None:
+    """Stream one explanation's tokens as ("messages", (chunk, metadata)) items."""
+    node = f"{snapshot.get('explain_key') or 'finish'}_explain"
+    if stop.is_set():
+        return
+    try:
+        for chunk in get_explain_runnable().stream(snapshot):
+            if stop.is_set():
+                return
+            out.put(("messages", (chunk, {"langgraph_node": node})))
+    except Exception as e:
+        # Narration is best-effort; the search itself carries on
+        print(f"Explain error in {node}: {e}")
+
+
+def _run_graph(
+    inputs: SearchState,
+    stream_mode: Tuple[str, ...],
+    out: "queue.Queue",
+    stop: threading.Event,
+) -> None:
+    """
+    Run the graph, forwarding the requested stream modes to `out` and handing
+    each node's explain request to a single narrator thread (so explanations
+    stay in pipeline order while the pipeline runs ahead of them).
+    """
+    snapshot: Dict[str, Any] = dict(inputs)
+    narrate = "messages" in stream_mode
+    narrator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-narrator")
+    try:
+        modes = sorted(set(stream_mode) | {"updates"})
+        for mode, chunk in get_search_graph().stream(inputs, stream_mode=modes):
+            if stop.is_set():
+                break
+            if mode in stream_mode:
+                out.put((mode, chunk))
+            if mode != "updates":
+                continue
+            for update in chunk.values():
+                if not isinstance(update, dict):
+                    continue
+                snapshot.update(update)
+                if narrate and "explain_key" in update:
+                    narrator.submit(_narrate, dict(snapshot), out, stop)
+    except Exception as e:
+        out.put(("error", e))
+    finally:
+        out.put(_GRAPH_DONE)
+        narrator.shutdown(wait=True)
+        out.put(_NARRATION_DONE)
+        connections.close_all()
+
+
 def stream_orchestrated_search(
     *,
     user_text: str,
     min_results: int = DEFAULT_MIN_RESULTS,
     max_rounds: int = DEFAULT_MAX_ROUNDS,
+    speculative_broaden: bool = DEFAULT_SPECULATIVE_BROADEN,
     stream_mode: Tuple[str, ...] = ("custom", "messages", "updates"),
 ) -> Generator[Tuple[str, Any], None, None]:
     """
@@ -316,14 +541,51 @@ def stream_orchestrated_search(
 
     Yields (mode, chunk) where:
       - mode == "custom": log/results events
-      - mode == "messages": LLM token streaming
+      - mode == "messages": LLM token streaming (selection LLM under node
+        "plan_round", narration under "<node>_explain")
       - mode == "updates": state deltas per node
+
+    The graph runs in a background thread and narration in another, so results
+    stream as soon as each search finishes; explanations trail behind and the
+    stream ends once the last one is done. Raises the graph's error, if any.
+
+    With `speculative_broaden` (off by default), round two's broadened
+    selection is requested while round one searches, saving an LLM round trip
+    when a second round is needed (at the cost of an unused call when it is
+    not). Round two only waits SPECULATIVE_WAIT_SECONDS for it.
     """
-    graph = build_search_graph()
     inputs: SearchState = {
         "user_text": user_text,
         "min_results": min_results,
         "max_rounds": max_rounds,
+        "speculative_broaden": speculative_broaden,
     }
-    for mode, chunk in graph.stream(inputs, stream_mode=list(stream_mode)):
-        yield mode, chunk
+    out: "queue.Queue" = queue.Queue()
+    stop = threading.Event()
+    producer = threading.Thread(
+        target=_run_graph, args=(inputs, tuple(stream_mode), out, stop),
+        name="search-graph", daemon=True)
+    producer.start()
+
+    error: Optional[BaseException] = None
+    try:
+        while True:
+            item = out.get()
+            if item is _NARRATION_DONE:
+                break
+            if item is _GRAPH_DONE:
+                continue
+            mode, chunk = item
+            if mode == "error":
+                error = chunk
+                continue
+            yield mode, chunk
+    finally:
+        # Also reached when the client disconnects and the generator is closed
+        stop.set()
+    if error is not None:
+        raise error
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,3 +1,5 @@
+import threading
+
 from django.conf import settings
 from langchain_openai import ChatOpenAI
 
@@ -27,18 +29,23 @@ def get_openai_model(model="gpt-5-nano", temperature=0.1, max_retries=2, streami
     )
 
 
-# Lazy-initialized structured LLMs (with_structured_output; typically non-streaming)
+# Lazy-initialized LLM clients, one per process. Chat models hold no per-call
+# state, so concurrent requests share them (and their HTTP connection pools).
 _structured_selection_llm = None
 _structured_explain_llm = None
+_explain_llm_streaming = None
+_lock = threading.Lock()
 
 
 def get_structured_selection_llm():
     """LLM bound to SearchSelectionsResponse for taxonomy selection generation."""
     global _structured_selection_llm
     if _structured_selection_llm is None:
-        base = get_openai_model()
-        _structured_selection_llm = base.with_structured_output(
-            SearchSelectionsResponse)
+        with _lock:
+            if _structured_selection_llm is None:
+                base = get_openai_model()
+                _structured_selection_llm = base.with_structured_output(
+                    SearchSelectionsResponse)
     return _structured_selection_llm
 
 
@@ -46,10 +53,18 @@ def get_structured_explain_llm():
     """LLM bound to ExplainResponse for user-facing strategy explanations."""
     global _structured_explain_llm
     if _structured_explain_llm is None:
-        base = get_openai_model(max_tokens=1000)
-        _structured_explain_llm = base.with_structured_output(ExplainResponse)
+        with _lock:
+            if _structured_explain_llm is None:
+                base = get_openai_model(max_tokens=1000)
+                _structured_explain_llm = base.with_structured_output(ExplainResponse)
     return _structured_explain_llm
 
 
 def get_explain_llm_streaming():
-    return get_openai_model(streaming=True, max_tokens=500)
+    """Streaming LLM for the explain nodes' narration."""
+    global _explain_llm_streaming
+    if _explain_llm_streaming is None:
+        with _lock:
+            if _explain_llm_streaming is None:
+                _explain_llm_streaming = get_openai_model(streaming=True, max_tokens=500)
+    return _explain_llm_streaming
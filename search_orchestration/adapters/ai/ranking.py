@@ -0,0 +1,150 @@
+"""
+Relevance ranking of candidate songs against the user's selection.
+
+Upstream order is per query, and broadened rounds bring in songs that only
+loosely fit, so results are re-ranked before they are shown. Every song's
+tags are encoded as a one-hot row over the MUSIC_TAXONOMY vocabulary and the
+whole candidate set is scored with a few NumPy matrix operations:
+
+  * tag score: for each category the selection constrains, the fraction of
+    its terms the song carries, averaged over those categories,
+  * BPM and duration proximity to a target (given, or else the median of the
+    candidates that match every selected term), decaying exponentially.
+
+Songs are returned best-first; equal scores keep their incoming order, so the
+fused upstream ranking breaks ties.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from search_orchestration.adapters.ai.state import Selection
+from search_orchestration.adapters.ai.taxonomy import MUSIC_TAXONOMY
+from search_orchestration.songs import Song
+
+TAG_WEIGHT = 1.0
+BPM_WEIGHT = 0.15
+DURATION_WEIGHT = 0.1
+# Distance (BPM / seconds) at which proximity has decayed to 1/e
+BPM_SCALE = 20.0
+DURATION_SCALE = 60.0
+
+CATEGORIES: Tuple[str, ...] = tuple(MUSIC_TAXONOMY)
+
+
+def _normalize(term: str) -> str:
+    return term.strip().casefold()
+
+
+def _build_vocabulary() -> Tuple[Dict[Tuple[str, str], int], np.ndarray]:
+    """Column of every (category, term) pair, and the category index of every column."""
+    columns: Dict[Tuple[str, str], int] = {}
+    categories: List[int] = []
+    for c, category in enumerate(CATEGORIES):
+        for term in MUSIC_TAXONOMY[category]:
+            key = (category, _normalize(term))
+            if key not in columns:
+                columns[key] = len(columns)
+                categories.append(c)
+    return columns, np.asarray(categories, dtype=np.intp)
+
+
+_COLUMNS, _COLUMN_CATEGORY = _build_vocabulary()
+
+
+def encode_songs(songs: Sequence[Song]) -> np.ndarray:
+    """(songs x vocabulary) float32 one-hot matrix of the songs' taxonomy tags."""
+    rows: List[int] = []
+    cols: List[int] = []
+    for row, song in enumerate(songs):
+        for category in CATEGORIES:
+            for term in song.tags_for(category):
+                col = _COLUMNS.get((category, _normalize(term)))
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+    matrix = np.zeros((len(songs), len(_COLUMNS)), dtype=np.float32)
+    matrix[rows, cols] = 1.0
+    return matrix
+
+
+def encode_selection(selection: Selection) -> np.ndarray:
+    """
+    (vocabulary x categories) matrix: column c holds 1/n for each of the n
+    terms selected in category c, so songs @ matrix gives per-category coverage.
+    """
+    matrix = np.zeros((len(_COLUMNS), len(CATEGORIES)), dtype=np.float32)
+    for c, category in enumerate(CATEGORIES):
+        cols = {
+            _COLUMNS[key] for key in
+            ((category, _normalize(term)) for term in selection.get(category) or [])
+            if key in _COLUMNS
+        }
+        for col in cols:
+            matrix[col, c] = 1.0 / len(cols)
+    return matrix
+
+
+def _proximity(values: np.ndarray, target: Optional[float], scale: float) -> np.ndarray:
+    """exp(-|value - target| / scale); 0 for missing values or without a target."""
+    if target is None:
+        return np.zeros_like(values)
+    proximity = np.exp(-np.abs(values - target) / scale)
+    return np.nan_to_num(proximity, nan=0.0)
+
+
+def _median_target(values: np.ndarray, mask: np.ndarray) -> Optional[float]:
+    picked = values[mask]
+    picked = picked[~np.isnan(picked)]
+    return float(np.median(picked)) if picked.size else None
+
+
+def score_songs(
+    songs: Sequence[Song],
+    selection: Selection,
+    *,
+    bpm: Optional[float] = None,
+    duration: Optional[float] = None,
+) -> np.ndarray:
+    """Relevance score of every song (higher is better), computed in one batch."""
+    if not songs:
+        return np.zeros(0, dtype=np.float32)
+
+    weights = encode_selection(selection)
+    constrained = weights.any(axis=0)
+    coverage = encode_songs(songs) @ weights[:, constrained]
+    tag_score = coverage.mean(axis=1) if constrained.any() else np.zeros(len(songs), dtype=np.float32)
+
+    bpms = np.array([np.nan if s.bpm is None else s.bpm for s in songs], dtype=np.float64)
+    durations = np.array([
+        np.nan if d is None else d
+        for d in ((s.primary_audio.duration_s if s.primary_audio else None) or s.duration for s in songs)
+    ], dtype=np.float64)
+
+    exact = tag_score >= 1.0 - 1e-6
+    if bpm is None:
+        bpm = _median_target(bpms, exact)
+    if duration is None:
+        duration = _median_target(durations, exact)
+
+    return (
+        TAG_WEIGHT * tag_score
+        + BPM_WEIGHT * _proximity(bpms, bpm, BPM_SCALE)
+        + DURATION_WEIGHT * _proximity(durations, duration, DURATION_SCALE)
+    )
+
+
+def rank_songs(
+    songs: Sequence[Song],
+    selection: Selection,
+    *,
+    bpm: Optional[float] = None,
+    duration: Optional[float] = None,
+) -> List[Song]:
+    """Songs best-first by score_songs; ties keep their incoming order."""
+    scores = score_songs(songs, selection, bpm=bpm, duration=duration)
+    # lexsort sorts by the last key first: descending score, then position
+    order = np.lexsort((np.arange(len(songs)), -scores))
+    return [songs[i] for i in order]
@@ -0,0 +1,121 @@
+"""
+Persistent memo of validated taxonomy selections.
+
+The same queries ("chill lo-fi") arrive hundreds of times a day, and every
+one used to send the full selection prompt to the LLM. generate_search_selections
+now looks the answer up here first. Entries are keyed by:
+
+  * the user text, normalized (Unicode NFKC, case-folded, punctuation and
+    whitespace collapsed), so trivially different spellings share an entry,
+  * the broaden flag,
+  * prior_counts in coarse buckets (they only steer how far to broaden),
+  * a version hash of the taxonomy and the selection prompt/instructions, so
+    changing either invalidates every entry.
+
+Stored in the "selections" cache (see settings.CACHES; an SQLite LRU file
+shared by the workers on a node), which bounds the entry count and evicts
+least recently used entries; entries expire after SEARCH_SELECTION_CACHE_TTL.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import caches, DEFAULT_CACHE_ALIAS
+from environs import Env
+
+from search_orchestration.adapters.ai.prompts import get_selection_instruction, get_selection_prompt
+from search_orchestration.adapters.ai.taxonomy import MUSIC_TAXONOMY
+from search_orchestration.clients.singleflight import SingleFlight
+
+env = Env()
+env.read_env()
+
+SELECTION_CACHE_ENABLED = env.bool("SEARCH_SELECTION_CACHE", True)
+SELECTION_CACHE_TTL = env.int("SEARCH_SELECTION_CACHE_TTL", 7 * 24 * 3600)
+SELECTION_CACHE_ALIAS = "selections"
+
+# Upper edges of the prior_counts buckets: 0, 1-4, 5-19, 20-49, 50-99, 100+
+COUNT_BUCKETS: Tuple[int, ...] = (0, 4, 19, 49, 99)
+
+_TOKEN_RE = re.compile(r"[\w&+#']+", re.UNICODE)
+
+# Concurrent misses for the same key share one LLM call
+_in_flight = SingleFlight()
+
+
+def normalize_query(text: str) -> str:
+    """Case-folded words of `text` joined by single spaces ("Chill  Lo-Fi!" -> "chill lo fi")."""
+    return " ".join(_TOKEN_RE.findall(unicodedata.normalize("NFKC", text).casefold()))
+
+
+def bucket_counts(prior_counts: Sequence[int]) -> Tuple[int, ...]:
+    """Bucket index of each count (see COUNT_BUCKETS)."""
+    buckets = []
+    for count in prior_counts:
+        bucket = len(COUNT_BUCKETS)
+        for i, edge in enumerate(COUNT_BUCKETS):
+            if count <= edge:
+                bucket = i
+                break
+        buckets.append(bucket)
+    return tuple(buckets)
+
+
+def _prompt_version() -> str:
+    """Hash of everything besides the key fields that shapes the LLM's answer."""
+    parts = [
+        json.dumps(MUSIC_TAXONOMY, sort_keys=True, ensure_ascii=False),
+        get_selection_prompt().pretty_repr(),
+        get_selection_instruction(broaden=False, prior_counts=[]),
+        get_selection_instruction(broaden=True, prior_counts=[]),
+    ]
+    return hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+PROMPT_VERSION = _prompt_version()
+
+
+def selection_cache_key(user_text: str, *, broaden: bool, prior_counts: Sequence[int]) -> str:
+    key = [PROMPT_VERSION, normalize_query(user_text), broaden, bucket_counts(prior_counts)]
+    digest = hashlib.md5(json.dumps(key, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return f"selections:{digest}"
+
+
+def _cache():
+    return caches[SELECTION_CACHE_ALIAS if SELECTION_CACHE_ALIAS in settings.CACHES else DEFAULT_CACHE_ALIAS]
+
+
+def memoized_selections(
+    user_text: str,
+    *,
+    broaden: bool,
+    prior_counts: Sequence[int],
+    generate: Callable[[], List[Dict[str, Any]]],
+) -> List[Dict[str, Any]]:
+    """
+    The cached selections for this query, or `generate()`'s (validated)
+    result, which is cached when non-empty. Errors from `generate` propagate
+    and are not cached.
+    """
+    if not SELECTION_CACHE_ENABLED:
+        return generate()
+
+    key = selection_cache_key(user_text, broaden=broaden, prior_counts=prior_counts)
+    cache = _cache()
+    cached: Optional[List[Dict[str, Any]]] = cache.get(key)
+    if cached is not None:
+        print('selections from cache', key)
+        return cached
+
+    def fill() -> List[Dict[str, Any]]:
+        selections = generate()
+        if selections:
+            cache.set(key, selections, SELECTION_CACHE_TTL)
+        return selections
+
+    return _in_flight.do(key, fill)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from concurrent.futures import Future
 from typing import Annotated, Any, Dict, List, Optional, TypedDict, NotRequired
 from langgraph.graph.message import add_messages
 from langchain_core.messages import BaseMessage
 
+from search_orchestration.songs import Song
+
 Taxonomy = Dict[str, List[str]]
 Selection = Dict[str, List[str]]
 
@@ -20,6 +23,9 @@ class SearchState(TypedDict):
     # The maximum number of rounds to run.
     max_rounds: int
 
+    # Request round two's broadened selection while round one is searching.
+    speculative_broaden: NotRequired[bool]
+
     # Runtime state (optional keys)
 
     # The current round index.
@@ -31,8 +37,17 @@ class SearchState(TypedDict):
     # The merged selection (after dedupe).
     merged_selection: NotRequired[Selection]
 
-    # The results returned from Soundstripe.
-    results: NotRequired[List[Dict[str, Any]]]
+    # Round one's merged selection (the user's intent before broadening); results are ranked against it.
+    target_selection: NotRequired[Selection]
+
+    # This round's individual selections, searched alongside the merged one.
+    selections: NotRequired[List[Selection]]
+
+    # The speculative broadened selections (pending LLM call), used if round one falls short.
+    speculative_selections: NotRequired[Optional[Future]]
+
+    # The results returned from Soundstripe (compact Song objects).
+    results: NotRequired[List[Song]]
 
     # The IDs of the songs that have already been seen.
     seen_ids: NotRequired[List[str]]
@@ -4,11 +4,12 @@ from typing import Any, Dict, List
 from langchain_core.tools import tool
 
 from search_orchestration.adapters.soundstripe_adapter import soundstripe_search
+from search_orchestration.adapters.ai.utils import song_to_context_item
 
 @tool
 def soundstripe_search_tool(selection: Dict[str, List[str]]) -> List[Dict[str, Any]]:
     """
     Search Soundstripe given a merged taxonomy selection dict.
-    Returns list of song dicts.
+    Returns list of song dicts (the song_to_context_item shape).
     """
-    return soundstripe_search(selection)
\ No newline at end of file
+    return [song_to_context_item(song) for song in soundstripe_search(selection)]
\ No newline at end of file
@@ -1,22 +1,17 @@
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Union
 import json
 
 from search_orchestration.adapters.ai.state import Selection, Taxonomy
 from search_orchestration.adapters.ai.taxonomy import MUSIC_TAXONOMY
+from search_orchestration.songs import Song, format_duration
 
 MAX_TERMS_PER_SELECTION = 5
 
 
-def _format_duration(seconds: Optional[int]) -> str:
-    """Format seconds as M:SS for display."""
-    if seconds is None or seconds < 0:
-        return ""
-    m, s = divmod(int(seconds), 60)
-    return f"{m}:{s:02d}"
-
-
-def song_to_context_item(song: Dict[str, Any]) -> Dict[str, Any]:
+def song_to_context_item(song: Union[Song, Dict[str, Any]]) -> Dict[str, Any]:
     """Serializable dict for UI: title, artists, primary_audio, tags (genre/mood/instrument/characteristic), duration, bpm."""
+    if isinstance(song, Song):
+        return song.to_context_item()
     artists: List[Dict[str, str]] = [
         {"name": (a.get("name") or ""), "image": (a.get("image") or "")}
         for a in (song.get("artists") or [])
@@ -35,7 +30,7 @@ def song_to_context_item(song: Dict[str, Any]) -> Dict[str, Any]:
             "instrument": list(tags.get("instrument") or []),
             "characteristic": list(tags.get("characteristic") or []),
         },
-        "duration_display": _format_duration(duration_s),
+        "duration_display": format_duration(duration_s),
         "bpm": song.get("bpm"),
     }
 
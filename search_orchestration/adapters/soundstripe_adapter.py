@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 
+from asgiref.sync import sync_to_async
+
 # Import your Soundstripe client function
 # Adjust this import path to where get_songs actually lives.
 from search_orchestration.clients.soundstripe_client import get_songs
+from search_orchestration.clients import soundstripe_async_client
+from search_orchestration.catalog_index import search_local_catalog
+from search_orchestration.result_cache import RESULT_CACHE_ENABLED, SearchFilter, result_cache
+from search_orchestration.songs import Song, compact_songs
 
 Selection = Dict[str, List[str]]
 
+# Reciprocal-rank-fusion constant: larger values flatten the advantage of top ranks
+RRF_K = 60
+
 
 def selection_to_get_songs_kwargs(selection: Selection) -> Dict[str, Any]:
     """
@@ -37,28 +47,211 @@ def soundstripe_search(
     *,
     q: Optional[str] = None,
     page_size: int = 20,
-) -> List[Dict[str, Any]]:
+    page: int = 1,
+    limit: Optional[int] = None,
+    bpm_min: Optional[int] = None,
+    bpm_max: Optional[int] = None,
+    duration_min: Optional[int] = None,
+    duration_max: Optional[int] = None,
+) -> List[Song]:
     """
-    Calls Soundstripe get_songs() and returns a list of flattened song dicts.
+    Calls Soundstripe get_songs() and returns the songs as compact Song objects
+    (see search_orchestration.songs; Song.to_context_item() gives the UI shape).
 
     - `q` can be used to pass the user's free-text query to Soundstripe too
       (optional, but often improves recall).
+    - `page_size` is the number of songs requested (1-100), so small requests
+      download small payloads.
+    - `page` (one-indexed) returns that page of `page_size` songs, for
+      callers that show results a page at a time.
+    - `limit` asks for up to that many songs; pages beyond the first are
+      fetched in parallel. Ignored when `page` is above 1.
+    - `bpm_*` / `duration_*` (seconds) restrict the results to those ranges.
+    - Live API songs come back in the compact list shape (only the fields
+      song_to_context_item renders; see SONG_LIST_FIELDS).
+
+    Served from the local catalog index when a mirror is available; the live
+    API is only the fallback, and a live search contained in a recent broader
+    one is answered from that result (see search_orchestration.result_cache).
+    """
+    search = SearchFilter.of(
+        selection, q=q, bpm_min=bpm_min, bpm_max=bpm_max,
+        duration_min=duration_min, duration_max=duration_max)
+    if page > 1:
+        return _search_page(selection, search, page_size=page_size, page=page)
+    local = _local_search(selection, search, limit=limit or page_size)
+    if local is not None:
+        print('resp from local catalog', len(local))
+        return local
+    return _live_search(selection, search, page_size=page_size, limit=limit)
+
+
+def _search_page(selection: Selection, search: SearchFilter, *, page_size: int, page: int) -> List[Song]:
     """
+    Page `page` of a search, from the source that answered page 1 when it can:
+    the local index, or a result cache entry holding every match (or enough
+    of them), sliced in its order. Only otherwise is upstream asked for the
+    page (get_songs' response cache still applies).
+    """
+    offset = (page - 1) * page_size
+    local = _local_search(selection, search, limit=offset + page_size)
+    if local is not None:
+        return local[offset:]
+    cached = _cached_search(search, offset + page_size)
+    if cached is not None:
+        return cached[offset:]
+    resp = get_songs(
+        page_size=page_size, page=page, compact=True, **_get_songs_kwargs(selection, search))
+    return _songs_from_response(resp)
+
+
+def _local_search(selection: Selection, search: SearchFilter, *, limit: int) -> Optional[List[Song]]:
+    if search.bpm == search.duration == (None, None):
+        return search_local_catalog(selection, q=search.q or None, limit=limit)
+    # The index only knows tags and words; apply the ranges to its matches
+    local = search_local_catalog(selection, q=search.q or None)
+    if local is None:
+        return None
+    return [song for song in local if search.matches(song)][:limit]
+
+
+def _get_songs_kwargs(selection: Selection, search: SearchFilter) -> Dict[str, Any]:
     kwargs = selection_to_get_songs_kwargs(selection)
 
     # Optional free-text query (search terms from tag-based search)
-    if q:
-        kwargs["q"] = q.strip()
+    if search.q:
+        kwargs["q"] = search.q
+    (kwargs["bpm_min"], kwargs["bpm_max"]) = search.bpm
+    (kwargs["duration_min"], kwargs["duration_max"]) = search.duration
+    return kwargs
 
-    # Your get_songs hardcodes page[size]=100 internally.
-    # If you later add paging, this adapter is where you'll pass it in.
 
-    resp = get_songs(**kwargs)
+def _cached_search(search: SearchFilter, requested: int) -> Optional[List[Song]]:
+    if not RESULT_CACHE_ENABLED:
+        return None
+    songs = result_cache.get(search, requested)
+    if songs is not None:
+        print('resp from result cache', len(songs))
+    return songs
+
+
+def _remember_search(search: SearchFilter, songs: List[Song], requested: int) -> None:
+    if RESULT_CACHE_ENABLED:
+        result_cache.put(search, songs, requested)
+
+
+def _live_search(
+    selection: Selection,
+    search: SearchFilter,
+    *,
+    page_size: int,
+    limit: Optional[int],
+) -> List[Song]:
+    requested = limit or page_size
+    cached = _cached_search(search, requested)
+    if cached is not None:
+        return cached
+
+    # List view: only request the fields song_to_context_item renders
+    resp = get_songs(
+        page_size=page_size, limit=limit, compact=True, **_get_songs_kwargs(selection, search))
     print('resp from soundstripe_search', len(resp["data"]))
     # Your get_songs() returns the response with `data` list of songs, flattened.
 
+    songs = _songs_from_response(resp)
+    _remember_search(search, songs, requested)
+    return songs
+
+
+def soundstripe_search_many(
+    selections: List[Selection],
+    *,
+    q: Optional[str] = None,
+    page_size: int = 20,
+    limit: Optional[int] = None,
+) -> List[List[Song]]:
+    """
+    Run soundstripe_search for every selection at once; returns one ranked
+    list per selection, in the same order.
+
+    Local-index lookups are in-memory and run inline; only the selections
+    that need the live API are fanned out to threads.
+    """
+    searches = [SearchFilter.of(selection, q=q) for selection in selections]
+    results: List[Optional[List[Song]]] = [
+        _local_search(selection, search, limit=limit or page_size)
+        for selection, search in zip(selections, searches)]
+    live = [i for i, songs in enumerate(results) if songs is None]
+    if len(live) == 1:
+        results[live[0]] = _live_search(
+            selections[live[0]], searches[live[0]], page_size=page_size, limit=limit)
+    elif live:
+        with ThreadPoolExecutor(max_workers=len(live)) as pool:
+            fetched = pool.map(
+                lambda i: _live_search(selections[i], searches[i], page_size=page_size, limit=limit),
+                live,
+            )
+            for i, songs in zip(live, fetched):
+                results[i] = songs
+    return results
+
+
+def reciprocal_rank_fusion(rankings: List[List[Song]], *, k: int = RRF_K) -> List[Song]:
+    """
+    Fuse several ranked song lists into one, deduplicated by song ID.
+
+    Each song scores sum(1 / (k + rank)) over the lists it appears in, so songs
+    that several selections agree on rise to the top. Ties keep first-seen order.
+    """
+    scores: Dict[str, float] = {}
+    songs: Dict[str, Song] = {}
+    for ranking in rankings:
+        seen = set()
+        for rank, song in enumerate(ranking, start=1):
+            if song.id in seen:
+                continue
+            seen.add(song.id)
+            scores[song.id] = scores.get(song.id, 0.0) + 1.0 / (k + rank)
+            songs.setdefault(song.id, song)
+    return [songs[song_id] for song_id in sorted(scores, key=scores.__getitem__, reverse=True)]
+
+
+async def asoundstripe_search(
+    selection: Selection,
+    *,
+    q: Optional[str] = None,
+    page_size: int = 20,
+    limit: Optional[int] = None,
+    bpm_min: Optional[int] = None,
+    bpm_max: Optional[int] = None,
+    duration_min: Optional[int] = None,
+    duration_max: Optional[int] = None,
+) -> List[Song]:
+    """
+    Async version of soundstripe_search, backed by the asyncio Soundstripe client.
+    """
+    search = SearchFilter.of(
+        selection, q=q, bpm_min=bpm_min, bpm_max=bpm_max,
+        duration_min=duration_min, duration_max=duration_max)
+    local = await sync_to_async(_local_search)(selection, search, limit=limit or page_size)
+    if local is not None:
+        return local
+
+    requested = limit or page_size
+    cached = _cached_search(search, requested)
+    if cached is not None:
+        return cached
+
+    resp = await soundstripe_async_client.get_songs(
+        page_size=page_size, limit=limit, compact=True, **_get_songs_kwargs(selection, search))
+    songs = _songs_from_response(resp)
+    _remember_search(search, songs, requested)
+    return songs
+
+
+def _songs_from_response(resp: Dict[str, Any]) -> List[Song]:
     songs = resp.get("data", [])
     if not isinstance(songs, list):
         return []
 
-    return songs
+    return compact_songs(songs)
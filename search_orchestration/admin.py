@@ -1,3 +1,18 @@
 from django.contrib import admin
 
+from .models import CatalogRecord, CatalogSyncState
+
 # Register your models here.
+
+
+@admin.register(CatalogRecord)
+class CatalogRecordAdmin(admin.ModelAdmin):
+    list_display = ('resource', 'external_id', 'synced_at')
+    list_filter = ('resource',)
+    search_fields = ('external_id',)
+
+
+@admin.register(CatalogSyncState)
+class CatalogSyncStateAdmin(admin.ModelAdmin):
+    list_display = ('resource', 'next_page', 'records_synced',
+                    'started_at', 'completed_at')
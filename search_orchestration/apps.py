@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from environs import Env
+
+env = Env()
+env.read_env()
 
 
 class SearchOrchestrationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'search_orchestration'
+
+    def ready(self):
+        # Compile the search graph and create its LLM clients at startup so the
+        # first search does not pay for it. Off by default: management commands
+        # have no use for them. (Otherwise they are built on first use.)
+        if env.bool("SEARCH_WARM_GRAPH", False):
+            from search_orchestration.adapters.ai.llm_search_orchestrator_v2 import (
+                get_explain_runnable,
+                get_search_graph,
+            )
+            from search_orchestration.adapters.ai.llms import get_structured_selection_llm
+
+            get_search_graph()
+            get_explain_runnable()
+            get_structured_selection_llm()
@@ -0,0 +1,158 @@
+"""
+Local mirror of the Soundstripe catalog.
+
+Soundstripe recommends indexing its API nightly instead of searching it live
+(see the link at the top of clients/soundstripe_client.py). This module walks
+each resource through full pagination and upserts the records, in the exact
+shape the client functions return them, into CatalogRecord. Progress is saved
+per page in CatalogSyncState so an interrupted run resumes where it stopped.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from search_orchestration.clients import jsonapi
+from search_orchestration.clients.soundstripe_client import (
+    MAX_PAGE_SIZE,
+    _get_uncached,
+    _has_next_page,
+    _include_params,
+    _playlists_params,
+    _songs_params,
+    _sound_effects_params,
+    _tags_params,
+)
+from search_orchestration.models import CatalogRecord, CatalogSyncState
+
+# resource -> fn(page, page_size) returning the client's (flattened) list response.
+# Pages are fetched past the response cache: a full walk would otherwise fill
+# it with pages no search reads and evict the entries searches do.
+PAGE_FETCHERS: Dict[str, Callable[[int, int], Dict[str, Any]]] = {
+    "songs": lambda page, size: jsonapi.normalize_songs(
+        _get_uncached("songs", _songs_params(page_size=size, page=page))),
+    "tags": lambda page, size: _get_uncached("tags", _tags_params(size=size, page=page)),
+    # sound effects are always requested 100 per page
+    "sound_effects": lambda page, size: jsonapi.normalize_sound_effects(
+        _get_uncached("sound_effects", _sound_effects_params(size=MAX_PAGE_SIZE, page=page))),
+    "categories": lambda page, size: _get_uncached("categories", _include_params(size=size, page=page)),
+    "playlists": lambda page, size: _get_uncached("playlists", _playlists_params(size=size, page=page)),
+}
+
+MIRRORED_RESOURCES = list(PAGE_FETCHERS)
+
+
+@dataclass
+class MirrorReport:
+    resource: str
+    pages: int = 0
+    records: int = 0
+    seconds: float = 0.0
+    resumed_from_page: int = 1
+    completed: bool = False
+    pruned: int = 0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+
+def mirror_resource(
+    resource: str,
+    *,
+    page_size: int = MAX_PAGE_SIZE,
+    restart: bool = False,
+    max_pages: Optional[int] = None,
+    on_page: Optional[Callable[[MirrorReport], None]] = None,
+) -> MirrorReport:
+    """
+    Walk one resource through full pagination and upsert every record locally.
+
+    Resumes from the saved cursor when the previous run did not complete
+    (unless `restart`). When a walk completes, records not seen during the run
+    are deleted, since they no longer exist upstream.
+    """
+    if resource not in PAGE_FETCHERS:
+        raise ValueError(
+            f"Resource must be one of: {', '.join(MIRRORED_RESOURCES)}")
+    fetch_page = PAGE_FETCHERS[resource]
+    if resource == "sound_effects":
+        page_size = MAX_PAGE_SIZE
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+    state, _ = CatalogSyncState.objects.get_or_create(resource=resource)
+    if restart or not state.in_progress or state.page_size != page_size:
+        state.next_page = 1
+        state.page_size = page_size
+        state.records_synced = 0
+        state.started_at = timezone.now()
+        state.completed_at = None
+        state.save()
+
+    report = MirrorReport(resource=resource, resumed_from_page=state.next_page)
+    started = time.perf_counter()
+
+    while max_pages is None or report.pages < max_pages:
+        response = fetch_page(state.next_page, page_size)
+        items: List[Dict[str, Any]] = response.get("data") or []
+        now = timezone.now()
+
+        with transaction.atomic():
+            if items:
+                CatalogRecord.objects.bulk_create(
+                    [
+                        CatalogRecord(
+                            resource=resource,
+                            external_id=str(item["id"]),
+                            data=item,
+                            synced_at=now,
+                        )
+                        for item in items if item.get("id") is not None
+                    ],
+                    update_conflicts=True,
+                    unique_fields=["resource", "external_id"],
+                    update_fields=["data", "synced_at"],
+                )
+            state.next_page += 1
+            state.records_synced += len(items)
+            if not _has_next_page(response, len(items), page_size):
+                state.completed_at = now
+                state.last_completed_at = now
+                report.completed = True
+            state.save()
+
+        report.pages += 1
+        report.records += len(items)
+        report.seconds = time.perf_counter() - started
+        if on_page:
+            on_page(report)
+        if report.completed:
+            break
+
+    if report.completed:
+        report.pruned, _ = CatalogRecord.objects.filter(
+            resource=resource, synced_at__lt=state.started_at).delete()
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def iter_local_records(resource: str) -> Iterator[Dict[str, Any]]:
+    """Yield the mirrored records of one resource, in the shape the client returns them."""
+    queryset = CatalogRecord.objects.filter(
+        resource=resource).order_by("id").values_list("data", flat=True)
+    yield from queryset.iterator(chunk_size=2000)
+
+
+def has_local_catalog(resource: str = "songs") -> bool:
+    """Whether at least one complete mirror of `resource` exists."""
+    return CatalogSyncState.objects.filter(
+        resource=resource, last_completed_at__isnull=False).exists()
@@ -0,0 +1,279 @@
+"""
+In-memory inverted index over the locally mirrored song catalog.
+
+Every song in the mirror gets an ordinal (its position in mirror order).
+
+  * Each tag term (genre / mood / instrument / characteristic, i.e. the
+    MUSIC_TAXONOMY categories) maps to a bitmap: a Python int whose bit N is
+    set when song N carries the term. There are only a few hundred terms, and
+    selection filters resolve with a handful of bitwise ORs (terms within a
+    category) and ANDs (across categories).
+  * Each word of a title, artist name or tag maps to a posting list: the
+    ascending ordinals of the songs containing it, in an array('I'). Most of
+    the tens of thousands of words occur in a few songs, so a dense bitmap
+    each would cost memory and build time for nothing. Query words intersect
+    their lists (shortest first, by binary search), then the tag bitmap
+    filters the survivors.
+
+Songs are held as compact Song objects (search_orchestration.songs) rather
+than the mirrored dicts. The index is built from CatalogRecord in a
+background thread and swapped in when done, and rebuilt the same way when a
+newer mirror run completes; requests never wait for a build. When there is no
+complete mirror, no index yet, or the query uses words the index has never
+seen, search_local_catalog returns None and callers fall back to the live API.
+"""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.db import DatabaseError, connections
+from environs import Env
+
+from search_orchestration.catalog import iter_local_records
+from search_orchestration.models import CatalogSyncState
+from search_orchestration.songs import Song, compact_songs
+
+env = Env()
+env.read_env()
+
+LOCAL_INDEX_ENABLED = env.bool("SOUNDSTRIPE_LOCAL_INDEX", True)
+# How often (seconds) to check whether a newer mirror run has completed
+INDEX_VERSION_CHECK_INTERVAL = env.float(
+    "SOUNDSTRIPE_LOCAL_INDEX_CHECK_INTERVAL", 60.0)
+
+# The MUSIC_TAXONOMY categories (not imported: the ai package imports the adapter, which imports us)
+TAG_CATEGORIES: Tuple[str, ...] = ("genre", "instrument", "characteristic", "mood")
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+def _normalize(term: str) -> str:
+    return term.strip().casefold()
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.casefold())
+
+
+def _iter_bits(bitmap: int) -> Iterator[int]:
+    """Yield the set bit positions of `bitmap` in ascending order."""
+    while bitmap:
+        low = bitmap & -bitmap
+        yield low.bit_length() - 1
+        bitmap ^= low
+
+
+def _bitmap(ordinals: array, size: int) -> int:
+    """Bitmap with the bits of `ordinals` set, built in one pass (not one big-int OR per song)."""
+    bits = bytearray((size + 7) // 8)
+    for ordinal in ordinals:
+        bits[ordinal >> 3] |= 1 << (ordinal & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _intersect(a: array, b: array) -> array:
+    """Ordinals in both lists: each of the shorter one is looked up in the longer."""
+    if len(a) > len(b):
+        a, b = b, a
+    result = array("I")
+    lo = 0
+    for ordinal in a:
+        lo = bisect_left(b, ordinal, lo)
+        if lo == len(b):
+            break
+        if b[lo] == ordinal:
+            result.append(ordinal)
+    return result
+
+
+class CatalogIndex:
+    """Tag bitmaps and title/artist word posting lists over a fixed song list."""
+
+    def __init__(self, songs: List[Song], version: Any = None):
+        self.songs = songs
+        self.version = version
+        self.tag_postings: Dict[Tuple[str, str], int] = {}
+        self.word_postings: Dict[str, array] = {}
+        self._build()
+
+    def _build(self) -> None:
+        tag_ordinals: Dict[Tuple[str, str], array] = {}
+        word_postings: Dict[str, array] = {}
+
+        # Ordinals ascend, so appending keeps every list sorted
+        for ordinal, song in enumerate(self.songs):
+            words = set(_words(song.title or ""))
+
+            for category in TAG_CATEGORIES:
+                for key in {(category, _normalize(term)) for term in song.tags_for(category)}:
+                    tag_ordinals.setdefault(key, array("I")).append(ordinal)
+                    words.update(_words(key[1]))
+
+            for artist in song.artists:
+                words.update(_words(artist.name))
+
+            for word in words:
+                word_postings.setdefault(word, array("I")).append(ordinal)
+
+        self.tag_postings = {
+            key: _bitmap(ordinals, len(self.songs)) for key, ordinals in tag_ordinals.items()}
+        self.word_postings = word_postings
+
+    def __len__(self) -> int:
+        return len(self.songs)
+
+    def match(self, selection: Dict[str, List[str]], q: Optional[str] = None) -> Optional[Iterator[int]]:
+        """
+        Resolve a selection (and optional free text) to the ordinals of matching songs, ascending.
+
+        Terms within one category are ORed, categories are ANDed, and every word
+        of `q` must match. Returns None when `q` contains a word the index has
+        never seen, since the live API may still match it (e.g. in descriptions).
+        """
+        tags = (1 << len(self.songs)) - 1
+
+        for category in TAG_CATEGORIES:
+            terms = selection.get(category) or []
+            if not terms:
+                continue
+            union = 0
+            for term in terms:
+                union |= self.tag_postings.get((category, _normalize(term)), 0)
+            tags &= union
+            if not tags:
+                return iter(())
+
+        postings: List[array] = []
+        for word in _words(q or ""):
+            word_postings = self.word_postings.get(word)
+            if word_postings is None:
+                return None
+            postings.append(word_postings)
+
+        if not postings:
+            return _iter_bits(tags)
+
+        postings.sort(key=len)
+        ordinals = postings[0]
+        for other in postings[1:]:
+            if not ordinals:
+                break
+            ordinals = _intersect(ordinals, other)
+        return (ordinal for ordinal in ordinals if tags >> ordinal & 1)
+
+    def search(
+        self,
+        selection: Dict[str, List[str]],
+        q: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[List[Song]]:
+        """
+        Matching songs in mirror order (at most `limit`), or None if the index cannot answer.
+        The returned Songs are shared with the index and must be treated as read-only.
+        """
+        ordinals = self.match(selection, q)
+        if ordinals is None:
+            return None
+        return [self.songs[ordinal] for ordinal in islice(ordinals, limit)]
+
+
+_lock = threading.Lock()
+_index: Optional[CatalogIndex] = None
+_version_checked_at: Optional[float] = None
+_refreshing = False
+
+
+def _mirror_version() -> Any:
+    return CatalogSyncState.objects.filter(resource="songs").values_list(
+        "last_completed_at", flat=True).first()
+
+
+def refresh_catalog_index() -> Optional[CatalogIndex]:
+    """
+    Check the mirror version and, when it changed, build a new index and swap it in.
+
+    Runs in the background thread get_catalog_index starts; callable directly
+    (e.g. after a mirror run) to build synchronously.
+    """
+    global _index
+    version = _mirror_version()
+    if version is None:
+        _index = None
+    elif _index is None or _index.version != version:
+        index = CatalogIndex(compact_songs(iter_local_records("songs")), version=version)
+        _index = index
+        print(f'catalog index built: {len(index)} songs')
+    return _index
+
+
+def _refresh_in_background() -> None:
+    global _refreshing
+    try:
+        refresh_catalog_index()
+    except DatabaseError as e:
+        print(f"Local catalog index unavailable: {e}")
+    finally:
+        # This thread's own connections; they are not reused after it exits
+        connections.close_all()
+        with _lock:
+            _refreshing = False
+
+
+def get_catalog_index() -> Optional[CatalogIndex]:
+    """
+    Return the current in-memory index without waiting for it.
+
+    At most every INDEX_VERSION_CHECK_INTERVAL seconds this starts a background
+    refresh (see refresh_catalog_index). Returns None when no complete song
+    mirror exists or before the first build has finished (callers then use
+    the live API).
+    """
+    global _version_checked_at, _refreshing
+    now = time.monotonic()
+    with _lock:
+        due = not _refreshing and (
+            _version_checked_at is None or now - _version_checked_at >= INDEX_VERSION_CHECK_INTERVAL)
+        if due:
+            _version_checked_at = now
+            _refreshing = True
+    if due:
+        threading.Thread(target=_refresh_in_background, name="catalog-index", daemon=True).start()
+    return _index
+
+
+def _reset_after_fork() -> None:
+    # The refresh thread (if any) does not exist in the child; keep the built index
+    global _lock, _refreshing, _version_checked_at
+    _lock = threading.Lock()
+    _refreshing = False
+    _version_checked_at = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def search_local_catalog(
+    selection: Dict[str, List[str]],
+    *,
+    q: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Optional[List[Song]]:
+    """
+    Answer a soundstripe_search from the local catalog index.
+
+    Returns None when the local index is disabled, unavailable or cannot
+    answer the query; the caller should then ask the live API.
+    """
+    if not LOCAL_INDEX_ENABLED:
+        return None
+    index = get_catalog_index()
+    if index is None:
+        return None
+    return index.search(selection, q=q, limit=limit)
@@ -0,0 +1,192 @@
+# Process-wide pooled HTTP transport for upstream API clients.
+#
+# One keep-alive httpx.Client is shared by every request made from a process so
+# repeated calls to the same host reuse TCP+TLS connections (and HTTP/2 streams)
+# instead of paying a fresh handshake each time. Async callers get one
+# httpx.AsyncClient per event loop, since async connections are loop-bound.
+#
+# SOUNDSTRIPE_TRANSPORT=record saves every response to SOUNDSTRIPE_CASSETTE_DIR;
+# SOUNDSTRIPE_TRANSPORT=replay serves them back offline (see clients/replay.py)
+# with SOUNDSTRIPE_REPLAY_LATENCY / _JITTER / _ERROR_RATE / _SEED injected.
+
+import asyncio
+import atexit
+import os
+import threading
+import weakref
+from typing import Optional, Union
+
+import httpx
+from environs import Env
+
+from search_orchestration.clients.replay import RecordingTransport, ReplayTransport
+
+env = Env()
+env.read_env()
+
+# Pool / timeout configuration (seconds for timeouts)
+HTTP2_ENABLED = env.bool("SOUNDSTRIPE_HTTP2", True)
+MAX_CONNECTIONS = env.int("SOUNDSTRIPE_MAX_CONNECTIONS", 20)
+MAX_KEEPALIVE_CONNECTIONS = env.int("SOUNDSTRIPE_MAX_KEEPALIVE_CONNECTIONS", 10)
+KEEPALIVE_EXPIRY = env.float("SOUNDSTRIPE_KEEPALIVE_EXPIRY", 30.0)
+CONNECT_TIMEOUT = env.float("SOUNDSTRIPE_CONNECT_TIMEOUT", 5.0)
+READ_TIMEOUT = env.float("SOUNDSTRIPE_READ_TIMEOUT", 20.0)
+WRITE_TIMEOUT = env.float("SOUNDSTRIPE_WRITE_TIMEOUT", 10.0)
+POOL_TIMEOUT = env.float("SOUNDSTRIPE_POOL_TIMEOUT", 5.0)
+
+# Transport: "live" (network), "record" (network + save to cassette) or "replay" (cassette only)
+TRANSPORT_MODE = env.str("SOUNDSTRIPE_TRANSPORT", "live")
+CASSETTE_DIR = env.str("SOUNDSTRIPE_CASSETTE_DIR", "soundstripe_cassette")
+REPLAY_LATENCY = env.float("SOUNDSTRIPE_REPLAY_LATENCY", 0.0)
+REPLAY_JITTER = env.float("SOUNDSTRIPE_REPLAY_JITTER", 0.0)
+REPLAY_ERROR_RATE = env.float("SOUNDSTRIPE_REPLAY_ERROR_RATE", 0.0)
+REPLAY_SEED = env.int("SOUNDSTRIPE_REPLAY_SEED", None)
+
+Transport = Union[httpx.BaseTransport, httpx.AsyncBaseTransport]
+
+_lock = threading.Lock()
+_client: Optional[httpx.Client] = None
+_client_pid: Optional[int] = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_async_clients_pid: Optional[int] = None
+_transport_override: Optional[Transport] = None
+
+
+def _build_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def _build_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=CONNECT_TIMEOUT,
+        read=READ_TIMEOUT,
+        write=WRITE_TIMEOUT,
+        pool=POOL_TIMEOUT,
+    )
+
+
+def _build_transport(use_async: bool) -> Optional[Transport]:
+    """The transport for new clients, or None for httpx's default network transport."""
+    if _transport_override is not None:
+        return _transport_override
+    if TRANSPORT_MODE == "replay":
+        return ReplayTransport(
+            CASSETTE_DIR,
+            latency=REPLAY_LATENCY,
+            jitter=REPLAY_JITTER,
+            error_rate=REPLAY_ERROR_RATE,
+            seed=REPLAY_SEED,
+        )
+    if TRANSPORT_MODE == "record":
+        if use_async:
+            return RecordingTransport(CASSETTE_DIR, async_transport=httpx.AsyncHTTPTransport(
+                http2=HTTP2_ENABLED, limits=_build_limits()))
+        return RecordingTransport(CASSETTE_DIR, transport=httpx.HTTPTransport(
+            http2=HTTP2_ENABLED, limits=_build_limits()))
+    return None
+
+
+def use_transport(transport: Optional[Transport]) -> None:
+    """
+    Route every pooled client in this process through `transport` (e.g. a
+    ReplayTransport in benchmarks); None restores SOUNDSTRIPE_TRANSPORT.
+    Existing clients are closed (sync) or dropped (async) and rebuilt on next use.
+    """
+    global _transport_override, _async_clients
+    close_client()
+    with _lock:
+        _transport_override = transport
+        _async_clients = weakref.WeakKeyDictionary()
+
+
+def get_client() -> httpx.Client:
+    """
+    Return the process-wide pooled httpx.Client, creating it on first use.
+
+    The client is bound to the process that created it: a forked child
+    (e.g. a gunicorn worker forked after the client was built) gets its own
+    client instead of sharing the parent's sockets.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    client = _client
+    if client is not None and _client_pid == pid:
+        return client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            _client = httpx.Client(
+                http2=HTTP2_ENABLED,
+                limits=_build_limits(),
+                timeout=_build_timeout(),
+                transport=_build_transport(use_async=False),
+            )
+            _client_pid = pid
+        return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Return the pooled httpx.AsyncClient for the running event loop.
+
+    Must be called from inside a coroutine. Each loop gets its own client;
+    like the sync client, a forked child never reuses the parent's clients.
+    """
+    global _async_clients, _async_clients_pid
+    loop = asyncio.get_running_loop()
+    pid = os.getpid()
+
+    with _lock:
+        if _async_clients_pid != pid:
+            _async_clients = weakref.WeakKeyDictionary()
+            _async_clients_pid = pid
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=HTTP2_ENABLED,
+                limits=_build_limits(),
+                timeout=_build_timeout(),
+                transport=_build_transport(use_async=True),
+            )
+            _async_clients[loop] = client
+        return client
+
+
+async def aclose_async_client() -> None:
+    """Close the pooled async client bound to the running event loop (if any)."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.pop(loop, None) if _async_clients_pid == os.getpid() else None
+    if client is not None:
+        await client.aclose()
+
+
+def close_client() -> None:
+    """Close the pooled client (if any) owned by this process."""
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+def _reset_after_fork() -> None:
+    # Drop (never close) the parent's client: closing would tear down
+    # connections the parent process is still using.
+    global _client, _client_pid, _async_clients, _async_clients_pid, _lock
+    _client = None
+    _client_pid = None
+    _async_clients = weakref.WeakKeyDictionary()
+    _async_clients_pid = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+atexit.register(close_client)
@@ -0,0 +1,144 @@
+# JSON:API response normalizer for the Soundstripe client.
+#
+# Turns raw Soundstripe JSON:API documents into the flattened records the rest
+# of the app uses: attributes lifted to the top level, related artists and
+# audio files inlined, and a `primary_audio` summary added. Every record is
+# built in a single pass as one new dict; the decoded document is never
+# mutated, and included resources are flattened once and shared by every song
+# that references them.
+
+from typing import Any, Dict, List, Tuple
+
+import orjson
+
+Lookup = Dict[Tuple[str, str], Dict[str, Any]]
+
+
+def decode(content: bytes) -> Any:
+    """Decode a JSON response body (orjson is several times faster than json.loads)."""
+    return orjson.loads(content)
+
+
+def _included_lookup(included: List[Dict[str, Any]]) -> Lookup:
+    """Flatten each included artist/audio_file once, keyed by (type, id)."""
+    lookup: Lookup = {}
+    for item in included:
+        item_type = item["type"]
+        if item_type == "artists" or item_type == "audio_files":
+            attributes = item.get("attributes")
+            lookup[(item_type, item["id"])] = (
+                {"id": item["id"], **attributes} if attributes else {"id": item["id"]})
+    return lookup
+
+
+def _primary_audio(audio_file: Dict[str, Any]) -> Dict[str, Any]:
+    versions = audio_file["versions"]
+    primary: Dict[str, Any] = {}
+    if "mp3" in versions:
+        primary["mp3"] = versions["mp3"]
+    if "wav" in versions:
+        primary["wav"] = versions["wav"]
+    # Add duration from the primary audio file
+    if "duration" in audio_file:
+        primary["duration_s"] = int(round(audio_file["duration"]))
+    return primary
+
+
+def _song(resource: Dict[str, Any], lookup: Lookup) -> Dict[str, Any]:
+    """Build one flattened song from a JSON:API song resource."""
+    song = {k: v for k, v in resource.items()
+            if k != "attributes" and k != "relationships"}
+    # Static type field - overridden for frontend consistency across catalogs
+    song["type"] = "song"
+    attributes = resource.get("attributes")
+    if attributes:
+        song.update(attributes)
+
+    relationships = resource.get("relationships") or {}
+    if "artists" in relationships:
+        song["artists"] = [
+            lookup[("artists", ref["id"])]
+            for ref in relationships["artists"]["data"]
+            if ("artists", ref["id"]) in lookup
+        ]
+    if "audio_files" in relationships:
+        audio_files = [
+            lookup[("audio_files", ref["id"])]
+            for ref in relationships["audio_files"]["data"]
+            if ("audio_files", ref["id"]) in lookup
+        ]
+        song["audio_files"] = audio_files
+        # The first audio file listed is the primary audio file
+        if audio_files and "versions" in audio_files[0]:
+            song["primary_audio"] = _primary_audio(audio_files[0])
+
+    return song
+
+
+def normalize_songs(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a songs list document; returns a new document without `included`."""
+    data = document.get("data")
+    # No results, or no included data (which also means no results)
+    if not data or not document.get("included"):
+        return document
+
+    lookup = _included_lookup(document["included"])
+    normalized = {k: v for k, v in document.items() if k != "included"}
+    normalized["data"] = [_song(resource, lookup) for resource in data]
+    return normalized
+
+
+def normalize_song(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a single song document and return just the song (without links)."""
+    if not document.get("included"):
+        raise Exception(
+            "Soundstripe API did not return expected format: missing 'included' data")
+
+    song = _song(document["data"], _included_lookup(document["included"]))
+    song.pop("links", None)
+    return song
+
+
+def _sound_effect(resource: Dict[str, Any]) -> Dict[str, Any]:
+    """Build one flattened sound effect from a JSON:API sound_effects resource."""
+    sound_effect = {k: v for k, v in resource.items() if k != "attributes"}
+    # Static type field - overridden for frontend consistency across catalogs
+    sound_effect["type"] = "sfx"
+    attributes = resource.get("attributes")
+    if attributes:
+        sound_effect.update(attributes)
+
+    # all_categories combines categories and subcategories
+    sound_effect["all_categories"] = (
+        sound_effect.get("categories", []) + sound_effect.get("subcategories", []))
+
+    primary: Dict[str, Any] = {}
+    versions = sound_effect.get("versions")
+    if versions is not None:
+        if "mp3" in versions:
+            primary["mp3"] = versions["mp3"]
+        if "wav" in versions:
+            primary["wav"] = versions["wav"]
+    if "duration" in sound_effect:
+        primary["duration_s"] = int(round(sound_effect["duration"]))
+    if versions is not None or "duration" in sound_effect:
+        sound_effect["primary_audio"] = primary
+
+    return sound_effect
+
+
+def normalize_sound_effects(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten every sound effect in a list document; returns a new document."""
+    if "data" not in document:
+        return document
+    normalized = dict(document)
+    normalized["data"] = [_sound_effect(resource)
+                          for resource in document["data"]]
+    return normalized
+
+
+def normalize_sound_effect(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a single sound effect document and return just the sound effect (without links)."""
+    sound_effect = _sound_effect(document.get("data", {}))
+    sound_effect.pop("links", None)
+    return sound_effect
@@ -0,0 +1,173 @@
+# Record/replay stand-in for the Soundstripe API.
+#
+# RecordingTransport wraps a real httpx transport and saves every response (but
+# 304s) to a cassette directory (one JSON file per canonical request). ReplayTransport
+# serves those files back without touching the network, with optional injected
+# latency and error rate, so the client, adapter and orchestrator stack can be
+# load-tested and benchmarked offline and deterministically.
+#
+# Both work for sync and async clients. http_pool installs them when
+# SOUNDSTRIPE_TRANSPORT is "record" or "replay" (see http_pool for the
+# settings), or pass one to http_pool.use_transport() directly.
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from search_orchestration.clients.request_keys import canonical_params
+
+# Response headers worth keeping (validators and content type)
+_KEPT_HEADERS = ("content-type", "etag", "last-modified")
+# Headers describing the wire encoding; invalid once the body has been decoded
+_ENCODING_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+def _request_key(request: httpx.Request) -> Dict[str, Any]:
+    return {
+        "method": request.method,
+        "path": request.url.path,
+        "params": canonical_params(dict(request.url.params.multi_items())),
+    }
+
+
+class Cassette:
+    """A directory of recorded responses, one JSON file per canonical request."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _file_for(self, key: Dict[str, Any]) -> str:
+        digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+        return os.path.join(self.path, f"{digest}.json")
+
+    def save(self, request: httpx.Request, status_code: int, headers: httpx.Headers, body: bytes) -> None:
+        # A 304 (answering a revalidation) has no body: keep the full response
+        # recorded earlier rather than one that cannot be replayed without a cache
+        if status_code == 304:
+            return
+        key = _request_key(request)
+        os.makedirs(self.path, exist_ok=True)
+        record = {
+            **key,
+            "status_code": status_code,
+            "headers": {name: headers[name] for name in _KEPT_HEADERS if name in headers},
+            "body": body.decode("utf-8"),
+        }
+        tmp = f"{self._file_for(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp, self._file_for(key))
+
+    def load(self, request: httpx.Request) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._file_for(_request_key(request)), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+
+def _decoded_response(response: httpx.Response, body: bytes) -> httpx.Response:
+    """Re-wrap an already decoded body without the headers that described its encoding."""
+    headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _ENCODING_HEADERS]
+    return httpx.Response(response.status_code, headers=headers, content=body)
+
+
+class RecordingTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Forward requests to `transport` (sync) / `async_transport` and record the responses."""
+
+    def __init__(
+        self,
+        cassette_dir: str,
+        transport: Optional[httpx.BaseTransport] = None,
+        async_transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.cassette = Cassette(cassette_dir)
+        self._transport = transport or httpx.HTTPTransport()
+        self._async_transport = async_transport or httpx.AsyncHTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self._transport.handle_request(request)
+        body = response.read()
+        self.cassette.save(request, response.status_code, response.headers, body)
+        return _decoded_response(response, body)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._async_transport.handle_async_request(request)
+        body = await response.aread()
+        self.cassette.save(request, response.status_code, response.headers, body)
+        return _decoded_response(response, body)
+
+    def close(self) -> None:
+        self._transport.close()
+
+    async def aclose(self) -> None:
+        await self._async_transport.aclose()
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    Serve recorded responses with injected latency and failures.
+
+    Args:
+        cassette_dir: Directory written by RecordingTransport
+        latency: Seconds added to every response
+        jitter: Up to this many extra seconds, uniformly random
+        error_rate: Fraction (0-1) of requests answered with `error_status` instead
+        error_status: Status code of injected failures
+        seed: Seed for the jitter/error randomness (deterministic runs)
+
+    Requests that were never recorded get a 404.
+    """
+
+    def __init__(
+        self,
+        cassette_dir: str,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ):
+        self.cassette = Cassette(cassette_dir)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _plan(self, request: httpx.Request):
+        """(delay, response) for a request."""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+        if fail:
+            return delay, httpx.Response(self.error_status, text="Injected failure", request=request)
+
+        record = self.cassette.load(request)
+        if record is None:
+            return delay, httpx.Response(
+                404, text=f"Not recorded: {request.method} {request.url}", request=request)
+        return delay, httpx.Response(
+            record["status_code"], headers=record["headers"],
+            content=record["body"].encode("utf-8"), request=request)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        delay, response = self._plan(request)
+        if delay:
+            time.sleep(delay)
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay, response = self._plan(request)
+        if delay:
+            await asyncio.sleep(delay)
+        return response
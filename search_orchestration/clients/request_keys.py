@@ -0,0 +1,114 @@
+# Canonical request keys for the Soundstripe client.
+#
+# Requests that mean the same thing should share one cache entry and one
+# upstream call. canonical_params rewrites query params into a single form:
+# comma-separated tag/include values (given as strings or lists) sorted and
+# de-duplicated, booleans and numbers rendered the way httpx sends them,
+# whitespace in free text collapsed, and no-op params (None, empty values,
+# page[number]=1) dropped. Keys come out sorted, so dict insertion order no
+# longer matters either.
+#
+# RequestKeyStats counts cache hits/misses and how many distinct raw param
+# forms collapsed onto each canonical key, so the gain is visible.
+
+import threading
+from typing import Any, Dict, Optional, Set, Tuple
+
+# Params whose value is an unordered comma-separated list
+_LIST_PARAM_PREFIXES = ("filter[tags]", "include", "fields[")
+
+# Params that, with this value, ask for exactly what omitting them asks for
+_NOOP_VALUES = {"page[number]": "1"}
+
+_MAX_TRACKED_KEYS = 10000
+
+
+def _render(value: Any) -> str:
+    """Render a param value the way httpx encodes it in the query string (lists comma-joined)."""
+    if isinstance(value, (list, tuple)):
+        return ",".join(_render(item) for item in value if item is not None)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _is_list_param(name: str) -> bool:
+    return name.startswith(_LIST_PARAM_PREFIXES)
+
+
+def canonical_params(params: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Return `params` in canonical form (sorted keys, string values, no-ops dropped)."""
+    canonical: Dict[str, str] = {}
+    for name in sorted(params or {}):
+        value = params[name]
+        if value is None:
+            continue
+
+        rendered = _render(value).strip()
+        if _is_list_param(name):
+            rendered = ",".join(sorted({part.strip() for part in rendered.split(",") if part.strip()}))
+        elif name == "filter[q]":
+            rendered = " ".join(rendered.split())
+
+        if rendered == "" or _NOOP_VALUES.get(name) == rendered:
+            continue
+        canonical[name] = rendered
+    return canonical
+
+
+def canonical_request(method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Tuple[str, str, str]:
+    """(METHOD, endpoint, query) identifying a request; used as the cache key args."""
+    query = "&".join(f"{name}={value}" for name, value in canonical_params(params).items())
+    return method.upper(), endpoint.strip("/"), query
+
+
+class RequestKeyStats:
+    """Thread-safe per-process counters for cache hits and canonical key collisions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            # canonical key -> distinct raw param forms seen for it
+            self._raw_forms: Dict[Tuple[str, str, str], Set[str]] = {}
+
+    def record(self, hit: bool, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> None:
+        key = canonical_request(method, endpoint, params)
+        raw = f"{method}:{endpoint}:{params!r}"
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if key not in self._raw_forms and len(self._raw_forms) >= _MAX_TRACKED_KEYS:
+                self._raw_forms.clear()
+            self._raw_forms.setdefault(key, set()).add(raw)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            raw_forms = sum(len(forms) for forms in self._raw_forms.values())
+            return {
+                "lookups": lookups,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "canonical_keys": len(self._raw_forms),
+                "raw_forms": raw_forms,
+                # Raw forms that would each have been a separate cache entry before canonicalization
+                "collisions": raw_forms - len(self._raw_forms),
+            }
+
+
+stats = RequestKeyStats()
+
+
+def get_request_key_stats() -> Dict[str, Any]:
+    """Hit rate and key-collision counts for this process since start (or the last reset)."""
+    return stats.snapshot()
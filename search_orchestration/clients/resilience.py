@@ -0,0 +1,389 @@
+# Latency and failure policy for upstream Soundstripe calls.
+#
+# Every GET the clients send goes through send() / asend(), which layer:
+#
+#   * per-endpoint timeouts (the read timeout differs by endpoint),
+#   * hedging: when an attempt is still running after the endpoint's observed
+#     p95 latency, a duplicate is sent and whichever answers first wins; a
+#     budget caps the share of requests that send one,
+#   * retries with exponential backoff and full jitter on 429 / 5xx / transport
+#     errors (honouring Retry-After),
+#   * a circuit breaker that fails fast with CircuitOpenError while upstream
+#     keeps failing, and lets a single trial request through after a cooldown.
+#
+# All GETs to the API are idempotent, which is what makes hedging and retrying safe.
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+import httpx
+from environs import Env
+
+from search_orchestration.clients.http_pool import CONNECT_TIMEOUT, POOL_TIMEOUT, READ_TIMEOUT, WRITE_TIMEOUT
+
+env = Env()
+env.read_env()
+
+# Read timeout (seconds) by endpoint (first path segment); others use SOUNDSTRIPE_READ_TIMEOUT
+READ_TIMEOUTS: Dict[str, float] = {
+    "songs": 10.0,
+    "sound_effects": 10.0,
+    "playlists": 10.0,
+    "tags": 5.0,
+    "categories": 5.0,
+    "playlist_categories": 5.0,
+    **env.dict("SOUNDSTRIPE_READ_TIMEOUTS", {}, subcast_values=float),
+}
+
+MAX_RETRIES = env.int("SOUNDSTRIPE_MAX_RETRIES", 2)
+BACKOFF_BASE = env.float("SOUNDSTRIPE_BACKOFF_BASE", 0.25)
+BACKOFF_MAX = env.float("SOUNDSTRIPE_BACKOFF_MAX", 4.0)
+
+HEDGE_ENABLED = env.bool("SOUNDSTRIPE_HEDGE", True)
+# Latency samples an endpoint needs before its p95 is trusted for hedging
+HEDGE_MIN_SAMPLES = env.int("SOUNDSTRIPE_HEDGE_MIN_SAMPLES", 20)
+HEDGE_MIN_DELAY = env.float("SOUNDSTRIPE_HEDGE_MIN_DELAY", 0.05)
+HEDGE_WORKERS = env.int("SOUNDSTRIPE_HEDGE_WORKERS", 16)
+# Share of requests that may send a hedge, and how many hedges may be banked for a burst
+HEDGE_BUDGET = env.float("SOUNDSTRIPE_HEDGE_BUDGET", 0.1)
+HEDGE_BUDGET_BURST = env.float("SOUNDSTRIPE_HEDGE_BUDGET_BURST", 10.0)
+
+BREAKER_FAILURE_THRESHOLD = env.int("SOUNDSTRIPE_BREAKER_FAILURES", 5)
+BREAKER_RESET_TIMEOUT = env.float("SOUNDSTRIPE_BREAKER_RESET_TIMEOUT", 30.0)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+LATENCY_WINDOW = 200
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+
+def _endpoint_root(endpoint: str) -> str:
+    return endpoint.strip("/").split("/", 1)[0]
+
+
+def timeout_for(endpoint: str) -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=CONNECT_TIMEOUT,
+        read=READ_TIMEOUTS.get(_endpoint_root(endpoint), READ_TIMEOUT),
+        write=WRITE_TIMEOUT,
+        pool=POOL_TIMEOUT,
+    )
+
+
+class LatencyTracker:
+    """Rolling window of successful response times per endpoint."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(_endpoint_root(endpoint), deque(maxlen=self._window))
+            samples.append(seconds)
+
+    def p95(self, endpoint: str) -> Optional[float]:
+        """Observed p95 latency, or None until enough samples exist."""
+        with self._lock:
+            samples = sorted(self._samples.get(_endpoint_root(endpoint), ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+class CircuitBreaker:
+    """
+    Closed: requests flow. After `failure_threshold` consecutive failures it
+    opens and rejects requests for `reset_timeout` seconds, then lets one trial
+    request through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        # When the half-open trial request was let through (a trial that never
+        # reports back stops blocking others after reset_timeout)
+        self._trial_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def before_request(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = time.monotonic()
+            trial_running = (
+                self._trial_started_at is not None and now - self._trial_started_at < self.reset_timeout)
+            if now - self._opened_at < self.reset_timeout or trial_running:
+                raise CircuitOpenError("Soundstripe circuit breaker is open; failing fast")
+            self._trial_started_at = now
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_started_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            trial_failed = self._trial_started_at is not None
+            if trial_failed or self._failures >= self.failure_threshold:
+                if self._opened_at is None or trial_failed:
+                    print(f'Soundstripe circuit breaker opened after {self._failures} failures')
+                self._opened_at = time.monotonic()
+            self._trial_started_at = None
+
+
+class HedgeBudget:
+    """
+    Token bucket for hedges: every request earns `ratio` of a token (up to
+    `burst` tokens) and every hedge sent spends one, so in the long run at most
+    `ratio` of requests are hedged, and a slow spell cannot double the load upstream.
+    """
+
+    def __init__(self, ratio: float = HEDGE_BUDGET, burst: float = HEDGE_BUDGET_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._tokens = burst
+
+    def earn(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def available(self) -> bool:
+        with self._lock:
+            return self._tokens >= 1.0
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+latency = LatencyTracker()
+breaker = CircuitBreaker()
+hedge_budget = HedgeBudget()
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_pool_lock = threading.Lock()
+# Requests using the pool: each needs a worker for its primary and one for its
+# hedge, so a hedge never queues behind other requests' primaries
+_hedge_slots = threading.BoundedSemaphore(max(1, HEDGE_WORKERS // 2))
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="soundstripe-hedge")
+        return _hedge_pool
+
+
+def _reset_after_fork() -> None:
+    # The parent's hedge threads do not exist in the child
+    global _hedge_pool, _hedge_pool_lock, _hedge_slots
+    _hedge_pool = None
+    _hedge_pool_lock = threading.Lock()
+    _hedge_slots = threading.BoundedSemaphore(max(1, HEDGE_WORKERS // 2))
+
+
+def _is_failure(response: httpx.Response) -> bool:
+    return response.status_code in RETRYABLE_STATUS_CODES
+
+
+def _backoff(attempt: int, response: Optional[httpx.Response]) -> float:
+    """Seconds to wait before retry number `attempt` (0-based): Retry-After, else full jitter."""
+    if response is not None and response.status_code == 429:
+        retry_after = response.headers.get("retry-after", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _hedge_delay(endpoint: str) -> Optional[float]:
+    """Seconds after which to hedge this request, or None when it may not be hedged."""
+    if not HEDGE_ENABLED:
+        return None
+    hedge_budget.earn()
+    p95 = latency.p95(endpoint)
+    if p95 is None or not hedge_budget.available():
+        return None
+    return max(p95, HEDGE_MIN_DELAY)
+
+
+def _timed(endpoint: str, request: Callable[[httpx.Timeout], httpx.Response]) -> httpx.Response:
+    started = time.perf_counter()
+    response = request(timeout_for(endpoint))
+    if not _is_failure(response):
+        latency.record(endpoint, time.perf_counter() - started)
+    return response
+
+
+def _release_when_done(slots: threading.BoundedSemaphore, futures: List[Future]) -> None:
+    """Release a hedge slot once every future of the request has finished (losers included)."""
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_future: Future) -> None:
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            slots.release()
+
+    for future in futures:
+        future.add_done_callback(done)
+
+
+def _attempt(endpoint: str, request: Callable[[httpx.Timeout], httpx.Response]) -> httpx.Response:
+    """
+    One attempt, hedged with a duplicate once it outlives the endpoint's p95.
+
+    A blocking call cannot be abandoned, so only a request that may be hedged
+    runs its primary in the pool (letting the caller take whichever answer comes
+    first); every other request, including all of them while the hedge budget
+    is spent or the pool is busy, runs on the caller's thread.
+    """
+    delay = _hedge_delay(endpoint)
+    slots = _hedge_slots
+    if delay is None or not slots.acquire(blocking=False):
+        return _timed(endpoint, request)
+
+    futures: List[Future] = []
+    try:
+        pool = _get_hedge_pool()
+        primary = pool.submit(_timed, endpoint, request)
+        futures.append(primary)
+        done, _ = wait([primary], timeout=delay)
+        if done or not hedge_budget.try_spend():
+            return primary.result()
+
+        print(f'Soundstripe {endpoint}: hedging after {delay:.3f}s')
+        futures.append(pool.submit(_timed, endpoint, request))
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+    finally:
+        if futures:
+            _release_when_done(slots, futures)
+        else:
+            slots.release()
+
+
+def send(endpoint: str, request: Callable[[httpx.Timeout], httpx.Response]) -> httpx.Response:
+    """
+    Send a GET through the breaker, hedging and retry policy.
+
+    `request(timeout)` performs the actual call. Returns the final response
+    (which may still be a 429/5xx once retries are exhausted), or raises the
+    last transport error or CircuitOpenError.
+    """
+    attempt = 0
+    while True:
+        breaker.before_request()
+        response: Optional[httpx.Response] = None
+        try:
+            response = _attempt(endpoint, request)
+        except httpx.TransportError:
+            breaker.record_failure()
+            if attempt >= MAX_RETRIES:
+                raise
+        else:
+            if not _is_failure(response):
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if attempt >= MAX_RETRIES:
+                return response
+        time.sleep(_backoff(attempt, response))
+        attempt += 1
+
+
+async def _atimed(endpoint: str, request: Callable[[httpx.Timeout], Awaitable[httpx.Response]]) -> httpx.Response:
+    started = time.perf_counter()
+    response = await request(timeout_for(endpoint))
+    if not _is_failure(response):
+        latency.record(endpoint, time.perf_counter() - started)
+    return response
+
+
+async def _aattempt(endpoint: str, request: Callable[[httpx.Timeout], Awaitable[httpx.Response]]) -> httpx.Response:
+    delay = _hedge_delay(endpoint)
+    primary = asyncio.ensure_future(_atimed(endpoint, request))
+    if delay is None:
+        return await primary
+
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done or not hedge_budget.try_spend():
+        return await primary
+
+    print(f'Soundstripe {endpoint}: hedging after {delay:.3f}s')
+    pending = {primary, asyncio.ensure_future(_atimed(endpoint, request))}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def asend(endpoint: str, request: Callable[[httpx.Timeout], Awaitable[httpx.Response]]) -> httpx.Response:
+    """Async version of send(); the losing hedge is cancelled."""
+    attempt = 0
+    while True:
+        breaker.before_request()
+        response: Optional[httpx.Response] = None
+        try:
+            response = await _aattempt(endpoint, request)
+        except httpx.TransportError:
+            breaker.record_failure()
+            if attempt >= MAX_RETRIES:
+                raise
+        else:
+            if not _is_failure(response):
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if attempt >= MAX_RETRIES:
+                return response
+        await asyncio.sleep(_backoff(attempt, response))
+        attempt += 1
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
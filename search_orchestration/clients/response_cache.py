@@ -0,0 +1,111 @@
+# Response cache for the Soundstripe clients: stale-while-revalidate with
+# conditional revalidation.
+#
+# Each cached response records when it was fetched and the validators the API
+# sent (ETag / Last-Modified). Within its endpoint's `fresh` window an entry is
+# served as is. After that it is still served for a further `stale` window, but
+# the caller also schedules a background refresh, so users never pay the full
+# upstream latency when an entry ages out. Refreshes send If-None-Match /
+# If-Modified-Since; a 304 just renews the entry without re-downloading it.
+#
+# Freshness is configured per endpoint (the first path segment), since songs,
+# tags, playlists and categories change at very different rates. Override with
+# e.g. SOUNDSTRIPE_CACHE_FRESH=songs=600,tags=604800 and SOUNDSTRIPE_CACHE_STALE.
+
+import hashlib
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+
+from environs import Env
+
+from search_orchestration.clients.request_keys import canonical_request
+
+env = Env()
+env.read_env()
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+@dataclass(frozen=True)
+class FreshnessPolicy:
+    fresh: int  # seconds an entry is served without revalidation
+    stale: int  # further seconds it is served while being revalidated in the background
+
+    @property
+    def timeout(self) -> int:
+        """How long the cache backend must keep the entry."""
+        return self.fresh + self.stale
+
+
+DEFAULT_POLICY = FreshnessPolicy(fresh=HOUR, stale=6 * HOUR)
+
+_DEFAULT_FRESH: Dict[str, int] = {
+    "songs": HOUR,
+    "sound_effects": 6 * HOUR,
+    "playlists": 6 * HOUR,
+    "tags": DAY,
+    "categories": DAY,
+    "playlist_categories": DAY,
+}
+_DEFAULT_STALE: Dict[str, int] = {
+    "songs": 6 * HOUR,
+    "sound_effects": DAY,
+    "playlists": DAY,
+    "tags": 7 * DAY,
+    "categories": 7 * DAY,
+    "playlist_categories": 7 * DAY,
+}
+
+_fresh = {**_DEFAULT_FRESH, **env.dict("SOUNDSTRIPE_CACHE_FRESH", {}, subcast_values=int)}
+_stale = {**_DEFAULT_STALE, **env.dict("SOUNDSTRIPE_CACHE_STALE", {}, subcast_values=int)}
+
+ENDPOINT_POLICIES: Dict[str, FreshnessPolicy] = {
+    endpoint: FreshnessPolicy(
+        fresh=_fresh.get(endpoint, DEFAULT_POLICY.fresh),
+        stale=_stale.get(endpoint, DEFAULT_POLICY.stale),
+    )
+    for endpoint in set(_fresh) | set(_stale)
+}
+
+
+def policy_for(endpoint: str) -> FreshnessPolicy:
+    """Freshness policy for an endpoint path such as "songs" or "songs/123"."""
+    return ENDPOINT_POLICIES.get(endpoint.strip("/").split("/", 1)[0], DEFAULT_POLICY)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: Any
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self, policy: FreshnessPolicy, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) - self.fetched_at < policy.fresh
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Validators to send when revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def renewed(self, etag: Optional[str] = None, last_modified: Optional[str] = None) -> "CachedResponse":
+        """This entry, confirmed unchanged by a 304 just now."""
+        return replace(
+            self,
+            fetched_at=time.time(),
+            etag=etag or self.etag,
+            last_modified=last_modified or self.last_modified,
+        )
+
+
+def cache_key(method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Django cache key for a request, shared by the sync and async clients."""
+    digest = hashlib.md5(
+        repr(canonical_request(method, endpoint, params)).encode()).hexdigest()
+    return f"soundstripe:{digest}"
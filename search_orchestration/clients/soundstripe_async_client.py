@@ -0,0 +1,258 @@
+# Soundstripe API Client (asyncio)
+#
+# Async twin of soundstripe_client: same functions, same arguments, same
+# flattened return shapes. Request building (soundstripe_client) and JSON:API
+# flattening (jsonapi) are shared with the sync module, and responses live under
+# the same cache keys, so a response fetched by either client is a cache hit for
+# the other.
+
+import asyncio
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from django.core.cache import caches, DEFAULT_CACHE_ALIAS
+
+from search_orchestration.clients import jsonapi, resilience, response_cache
+from search_orchestration.clients.http_pool import get_async_client
+from search_orchestration.clients.request_keys import canonical_params, canonical_request
+from search_orchestration.clients.singleflight import AsyncSingleFlight
+from search_orchestration.clients.soundstripe_client import (
+    MAX_PAGE_SIZE,
+    PREFETCH_CONCURRENCY,
+    _cache_hit,
+    _cache_miss,
+    _cached_response,
+    _cached_songs,
+    _get_headers,
+    _has_next_page,
+    _include_params,
+    _merge_song_pages,
+    _page_params,
+    _pages_to_prefetch,
+    _playlist_categories_by_id,
+    _playlist_params,
+    _playlists_params,
+    _schedule_revalidation,
+    _song_cache_keys,
+    _songs_params,
+    _sound_effects_params,
+    _tags_params,
+    _unique_ids,
+    api_base,
+)
+
+# Concurrent cache misses for the same canonical request share one upstream call
+_in_flight = AsyncSingleFlight()
+
+
+async def _make_request(method: str, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+    """
+    Make an HTTP request to the Soundstripe API, sharing the sync client's cache
+    entries and freshness policy. Stale entries are refreshed on the sync
+    client's background revalidation threads.
+    """
+    if method.lower() != "get":
+        raise ValueError(f"Unsupported HTTP method: {method}")
+
+    cache = caches[DEFAULT_CACHE_ALIAS]
+    canonical = canonical_params(params)
+    cache_key = response_cache.cache_key(method, endpoint, canonical)
+    policy = response_cache.policy_for(endpoint)
+    entry = await cache.aget(cache_key)
+    if entry is not None:
+        _cache_hit(method, endpoint, params)
+        if not entry.is_fresh(policy):
+            _schedule_revalidation(endpoint, canonical, entry)
+        return entry.body
+
+    _cache_miss(method, endpoint, params)
+
+    async def fetch() -> Dict[str, Any]:
+        client = get_async_client()
+        response = await resilience.asend(endpoint, lambda timeout: client.get(
+            f"{api_base}/{endpoint}", headers=_get_headers(), params=canonical, timeout=timeout))
+        entry = _cached_response(response)
+        await cache.aset(cache_key, entry, policy.timeout)
+        return entry.body
+
+    return await _in_flight.do(canonical_request(method, endpoint, canonical), fetch)
+
+
+async def get_songs(
+    bpm_max: Optional[int] = None,
+    bpm_min: Optional[int] = None,
+    duration_consider_alternate_audio_files: Optional[bool] = None,
+    duration_max: Optional[int] = None,
+    duration_min: Optional[int] = None,
+    energy: Optional[str] = None,
+    include_alternate_audio_files: Optional[bool] = None,
+    instrumental: Optional[bool] = None,
+    q: Optional[str] = None,
+    tags_characteristic: Optional[str] = None,
+    tags_genre: Optional[str] = None,
+    tags_instrument: Optional[str] = None,
+    tags_mood: Optional[str] = None,
+    vocals: Optional[bool] = None,
+    mode: Optional[str] = None,
+    key: Optional[str] = None,
+    page_size: int = MAX_PAGE_SIZE,
+    page: Optional[int] = None,
+    limit: Optional[int] = None,
+    compact: bool = False
+) -> Dict:
+    """Async version of soundstripe_client.get_songs."""
+    params = _songs_params(
+        bpm_max=bpm_max,
+        bpm_min=bpm_min,
+        duration_consider_alternate_audio_files=duration_consider_alternate_audio_files,
+        duration_max=duration_max,
+        duration_min=duration_min,
+        energy=energy,
+        include_alternate_audio_files=include_alternate_audio_files,
+        instrumental=instrumental,
+        q=q,
+        tags_characteristic=tags_characteristic,
+        tags_genre=tags_genre,
+        tags_instrument=tags_instrument,
+        tags_mood=tags_mood,
+        vocals=vocals,
+        mode=mode,
+        key=key,
+        page_size=page_size,
+        page=page,
+        compact=compact,
+    )
+    response = jsonapi.normalize_songs(await _make_request("GET", "songs", params))
+    if limit is None or page is not None:
+        return response
+
+    page_size = params["page[size]"]
+    page_count = _pages_to_prefetch(response, limit, page_size)
+    if page_count <= 1:
+        response["data"] = (response.get("data") or [])[:limit]
+        return response
+
+    window = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+
+    async def fetch_page(number: int) -> Dict:
+        async with window:
+            return jsonapi.normalize_songs(
+                await _make_request("GET", "songs", {**params, "page[number]": number}))
+
+    pages = await asyncio.gather(*(fetch_page(n) for n in range(2, page_count + 1)))
+    return _merge_song_pages(response, list(pages), limit, page_size)
+
+
+async def aiter_song_pages(
+    page_size: int = MAX_PAGE_SIZE,
+    max_pages: Optional[int] = None,
+    **filters: Any
+) -> AsyncGenerator[List[Dict], None]:
+    """Async version of soundstripe_client.iter_song_pages."""
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    page = 1
+    while max_pages is None or page <= max_pages:
+        response = await get_songs(page_size=page_size, page=page, **filters)
+        songs = response.get("data") or []
+        if songs:
+            yield songs
+        if not _has_next_page(response, len(songs), page_size):
+            return
+        page += 1
+
+
+async def get_song(song_id: str) -> Dict:
+    """Async version of soundstripe_client.get_song."""
+    response = await _make_request("GET", f"songs/{song_id}")
+    return jsonapi.normalize_song(response)
+
+
+async def get_songs_by_ids(song_ids: List[str]) -> List[Dict]:
+    """Async version of soundstripe_client.get_songs_by_ids."""
+    ids = _unique_ids(song_ids)
+    if not ids:
+        return []
+
+    keys = _song_cache_keys(ids)
+    songs = _cached_songs(keys, await caches[DEFAULT_CACHE_ALIAS].aget_many(list(keys.values())))
+
+    misses = [song_id for song_id in ids if song_id not in songs]
+    window = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+
+    async def fetch(song_id: str) -> Dict:
+        async with window:
+            return await get_song(song_id)
+
+    songs.update(zip(misses, await asyncio.gather(*(fetch(song_id) for song_id in misses))))
+    return [songs[song_id] for song_id in ids]
+
+
+async def get_tags(category: Optional[str] = None, size: Optional[int] = None, page: Optional[int] = None) -> Dict:
+    """Async version of soundstripe_client.get_tags."""
+    return await _make_request("GET", "tags", _tags_params(category, size, page))
+
+
+async def get_sound_effects(
+    q: Optional[str] = None,
+    categories: Optional[str] = None,
+    size: Optional[int] = None,
+    page: Optional[int] = None
+) -> Dict:
+    """Async version of soundstripe_client.get_sound_effects."""
+    params = _sound_effects_params(q, categories, size, page)
+    response = await _make_request("GET", "sound_effects", params)
+    return jsonapi.normalize_sound_effects(response)
+
+
+async def get_sound_effect(sfx_id: str) -> Dict:
+    """Async version of soundstripe_client.get_sound_effect."""
+    response = await _make_request("GET", f"sound_effects/{sfx_id}")
+    return jsonapi.normalize_sound_effect(response)
+
+
+async def get_categories(include: Optional[List[str]] = None, size: Optional[int] = None, page: Optional[int] = None) -> Dict:
+    """Async version of soundstripe_client.get_categories."""
+    return await _make_request("GET", "categories", _include_params(include, size, page))
+
+
+async def get_category(category_id: str, include: Optional[str] = None) -> Dict:
+    """Async version of soundstripe_client.get_category."""
+    return await _make_request("GET", f"categories/{category_id}", _include_params(include))
+
+
+async def get_playlists(
+    include: Optional[str] = None,
+    include_alternate_audio_files: Optional[bool] = None,
+    playlist_category_ids: Optional[str] = None,
+    media_type: Optional[str] = None,
+    size: Optional[int] = None,
+    page: Optional[int] = None
+) -> Dict:
+    """Async version of soundstripe_client.get_playlists."""
+    params = _playlists_params(
+        include, include_alternate_audio_files, playlist_category_ids, media_type, size, page)
+    return await _make_request("GET", "playlists", params)
+
+
+async def get_playlist(
+    playlist_id: str,
+    include: Optional[str] = None,
+    include_alternate_audio_files: Optional[bool] = None,
+    size: Optional[int] = None,
+    page: Optional[int] = None,
+    media_type: Optional[str] = None
+) -> Dict:
+    """Async version of soundstripe_client.get_playlist."""
+    params = _playlist_params(
+        include, include_alternate_audio_files, size, page, media_type)
+    return await _make_request("GET", f"playlists/{playlist_id}", params)
+
+
+async def get_playlist_categories(size: Optional[int] = None, page: Optional[int] = None) -> Dict:
+    """Async version of soundstripe_client.get_playlist_categories."""
+    response = await _make_request("GET", "playlist_categories", _page_params(size, page))
+    return _playlist_categories_by_id(response)
+
+
+async def get_playlist_category(playlist_category_id: str) -> Dict:
+    """Async version of soundstripe_client.get_playlist_category."""
+    return await _make_request("GET", f"playlist_categories/{playlist_category_id}")
@@ -1,12 +1,24 @@
 # Soundstripe API Client
 # https://docs.soundstripe.com/docs/integrating-soundstripes-content-into-your-application#option-1-recommended-index-soundstripes-api-nightly
 
-from typing import Dict, List, Optional, Any
-from cache_memoize import cache_memoize
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Generator, List, Optional, Any
+from urllib.parse import parse_qs, urlparse
 
 import httpx
+from django.core.cache import caches, DEFAULT_CACHE_ALIAS
 from environs import Env
 
+from search_orchestration.clients import jsonapi, resilience, response_cache
+from search_orchestration.clients.http_pool import get_client
+from search_orchestration.clients.response_cache import CachedResponse
+from search_orchestration.clients.request_keys import canonical_params, canonical_request, stats
+from search_orchestration.clients.singleflight import SingleFlight
+
 env = Env()
 env.read_env()
 
@@ -26,28 +38,158 @@ def _get_headers() -> Dict[str, str]:
     }
 
 
+# Largest page[size] the Soundstripe API accepts
+MAX_PAGE_SIZE = 100
+
+# Sparse fieldsets + minimal includes for list views: only what song_to_context_item
+# renders. get_songs(compact=True) sends these; the default is the full shape.
+SONG_LIST_FIELDS: Dict[str, str] = {
+    "fields[songs]": "title,bpm,duration,tags,artists,audio_files",
+    "fields[artists]": "name,image",
+    "fields[audio_files]": "duration,versions",
+    "include": "artists,audio_files",
+}
+
+# How many song pages may be in flight at once when prefetching deep result sets
+PREFETCH_CONCURRENCY = env.int("SOUNDSTRIPE_PREFETCH_CONCURRENCY", 4)
+
+# Background threads refreshing stale cache entries
+REVALIDATION_WORKERS = env.int("SOUNDSTRIPE_REVALIDATION_WORKERS", 2)
+
+# Concurrent cache misses for the same canonical request share one upstream call
+_in_flight = SingleFlight()
+
+
 def _cache_hit(*args, **kwargs):
+    stats.record(True, *args, **kwargs)
     print('SS client cachehit')
 
 
-@cache_memoize(3600, hit_callable=_cache_hit)
-def _make_request(method: str, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
-    """Make an HTTP request to the Soundstripe API."""
+def _cache_miss(*args, **kwargs):
+    stats.record(False, *args, **kwargs)
+
+
+def _handle_response(response: httpx.Response) -> Dict[str, Any]:
+    """Return the decoded JSON body of a successful response, raise otherwise."""
+    if response.status_code == 200:
+        return jsonapi.decode(response.content)
+    raise httpx.HTTPError(
+        f"HTTP {response.status_code}: {response.text}")
+
+
+def _cached_response(response: httpx.Response, previous: Optional[CachedResponse] = None) -> CachedResponse:
+    """Turn a (possibly conditional) response into a cache entry; a 304 renews `previous`."""
+    etag = response.headers.get("etag")
+    last_modified = response.headers.get("last-modified")
+    if response.status_code == 304 and previous is not None:
+        print('SS client revalidated (304)')
+        return previous.renewed(etag, last_modified)
+    return CachedResponse(
+        body=_handle_response(response),
+        fetched_at=time.time(),
+        etag=etag,
+        last_modified=last_modified,
+    )
+
+
+def _fetch(endpoint: str, params: Dict[str, str], previous: Optional[CachedResponse] = None) -> CachedResponse:
+    """GET a canonical request (conditionally when revalidating) and store the result."""
+    headers = _get_headers()
+    if previous is not None:
+        headers.update(previous.conditional_headers())
     url = f"{api_base}/{endpoint}"
+    response = resilience.send(
+        endpoint, lambda timeout: get_client().get(url, headers=headers, params=params, timeout=timeout))
+    entry = _cached_response(response, previous)
+    caches[DEFAULT_CACHE_ALIAS].set(
+        response_cache.cache_key("GET", endpoint, params), entry,
+        response_cache.policy_for(endpoint).timeout)
+    return entry
+
+
+def _get_uncached(endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+    """
+    GET over the pooled client and the resilience policy, bypassing the response
+    cache: for bulk walks (the catalog mirror) whose pages no search asks for
+    again, and which would only evict the entries live searches reuse.
+    """
     headers = _get_headers()
+    canonical = canonical_params(params)
+    url = f"{api_base}/{endpoint}"
+    response = resilience.send(
+        endpoint, lambda timeout: get_client().get(url, headers=headers, params=canonical, timeout=timeout))
+    return _handle_response(response)
+
+
+_revalidation_lock = threading.Lock()
+_revalidating = set()
+_revalidation_pool: Optional[ThreadPoolExecutor] = None
+_revalidation_pool_pid: Optional[int] = None
+
+
+def _revalidate(endpoint: str, params: Dict[str, str], previous: CachedResponse) -> None:
+    key = canonical_request("GET", endpoint, params)
+    try:
+        _in_flight.do(key, lambda: _fetch(endpoint, params, previous))
+    except Exception as e:
+        # The stale entry keeps being served until it expires
+        print(f"Soundstripe revalidation failed for {endpoint}: {e}")
+    finally:
+        with _revalidation_lock:
+            _revalidating.discard(key)
+
+
+def _schedule_revalidation(endpoint: str, params: Dict[str, str], previous: CachedResponse) -> None:
+    """Refresh a stale entry in the background, at most once at a time per request."""
+    global _revalidation_pool, _revalidation_pool_pid
+    key = canonical_request("GET", endpoint, params)
+    with _revalidation_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+        # Worker threads do not survive a fork, so each process needs its own pool
+        if _revalidation_pool is None or _revalidation_pool_pid != os.getpid():
+            _revalidation_pool = ThreadPoolExecutor(
+                max_workers=REVALIDATION_WORKERS, thread_name_prefix="soundstripe-revalidate")
+            _revalidation_pool_pid = os.getpid()
+        pool = _revalidation_pool
+    pool.submit(_revalidate, endpoint, params, previous)
+
+
+def _make_request(method: str, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+    """
+    Make an HTTP request to the Soundstripe API over the pooled keep-alive client.
 
-    if method.lower() == "get":
-        response = httpx.get(url, headers=headers, params=params or {})
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise httpx.HTTPError(
-                f"HTTP {response.status_code}: {response.text}")
-    else:
+    Responses are cached under the canonical form of the request (which is also
+    what is sent) following the endpoint's freshness policy: stale entries are
+    served while a background conditional request refreshes them, and
+    concurrent misses for the same request wait on a single upstream call.
+    """
+    if method.lower() != "get":
         raise ValueError(f"Unsupported HTTP method: {method}")
 
+    canonical = canonical_params(params)
+    entry = caches[DEFAULT_CACHE_ALIAS].get(response_cache.cache_key(method, endpoint, canonical))
+    if entry is not None:
+        _cache_hit(method, endpoint, params)
+        if not entry.is_fresh(response_cache.policy_for(endpoint)):
+            _schedule_revalidation(endpoint, canonical, entry)
+        return entry.body
 
-def get_songs(
+    _cache_miss(method, endpoint, params)
+    return _in_flight.do(
+        canonical_request(method, endpoint, canonical),
+        lambda: _fetch(endpoint, canonical),
+    ).body
+
+
+# -----------------------------
+# Request builders
+# (shared by this module and the async client; response flattening lives in jsonapi)
+# -----------------------------
+
+
+def _songs_params(
     bpm_max: Optional[int] = None,
     bpm_min: Optional[int] = None,
     duration_consider_alternate_audio_files: Optional[bool] = None,
@@ -63,33 +205,12 @@ def get_songs(
     tags_mood: Optional[str] = None,
     vocals: Optional[bool] = None,
     mode: Optional[str] = None,
-    key: Optional[str] = None
-) -> Dict:
-    """
-    Retrieve a list of songs from the Soundstripe API.
-
-    Args:
-        bpm_max: Maximum BPM
-        bpm_min: Minimum BPM
-        duration_consider_alternate_audio_files: If true, songs will be returned if any of their audio files match the supplied duration criteria
-        duration_max: Maximum duration of the song's primary audio file
-        duration_min: Minimum duration of the song's primary audio file
-        energy: Energy to filter by. One of: very_low, low, medium or high
-        include_alternate_audio_files: If true, all audio files for each song will be returned
-        instrumental: If true, only show songs that have at least one instrumental audio file
-        q: Search query
-        tags_characteristic: Comma-separated characteristic tags to filter by
-        tags_genre: Comma-separated genre tags to filter by
-        tags_instrument: Comma-separated instrument tags to filter by
-        tags_mood: Comma-separated mood tags to filter by
-        vocals: If true, only show songs that have at least one vocal audio file
-        mode: Mode to filter by (e.g., major, minor)
-        key: Key to filter by (e.g., C, D, E)
-
-    Returns:
-        Dict: The API response data
-    """
-    # Build query parameters
+    key: Optional[str] = None,
+    page_size: int = MAX_PAGE_SIZE,
+    page: Optional[int] = None,
+    compact: bool = False
+) -> Dict[str, Any]:
+    """Build the JSON:API query parameters for the songs endpoint."""
     params = {}
 
     if bpm_max is not None:
@@ -124,89 +245,300 @@ def get_songs(
         params["filter[key][mode]"] = mode
     if key is not None:
         params["filter[key][name]"] = key
-    params["page[size]"] = 100  # TODO static search for 100
+    params["page[size]"] = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    if page is not None:
+        params["page[number]"] = page
+    if compact:
+        params.update(SONG_LIST_FIELDS)
     print('params from get_songs', params)
-    # TODO page[number] = page_num
-    response = _make_request("GET", "songs", params)
-    #  if no data, return empty list
-    if not response.get("data", []):
+    return params
+
+
+def _has_next_page(response: Dict, page_len: int, page_size: int) -> bool:
+    """Whether a songs list response is followed by another page."""
+    if page_len < page_size:
+        return False
+    links = response.get("links")
+    if isinstance(links, dict) and "next" in links:
+        return bool(links["next"])
+    # No pagination links: a full page means there may be more
+    return page_len > 0
+
+
+def _total_pages(response: Dict, page_size: int) -> Optional[int]:
+    """Learn the number of result pages from JSON:API meta/links, if the response says."""
+    meta = response.get("meta") or {}
+    for count_key in ("total_count", "record_count", "total", "count"):
+        total = meta.get(count_key)
+        if isinstance(total, int):
+            return math.ceil(total / page_size)
+    for pages_key in ("total_pages", "page_count"):
+        pages = meta.get(pages_key)
+        if isinstance(pages, int):
+            return pages
+
+    last = (response.get("links") or {}).get("last")
+    if isinstance(last, str):
+        number = parse_qs(urlparse(last).query).get("page[number]")
+        if number and number[0].isdigit():
+            return int(number[0])
+    return None
+
+
+def _pages_to_prefetch(first_page: Dict, limit: int, page_size: int) -> int:
+    """How many pages (including the first) are needed to collect `limit` songs."""
+    wanted = math.ceil(limit / page_size)
+    total = _total_pages(first_page, page_size)
+    if total is not None:
+        return max(1, min(wanted, total))
+    if not _has_next_page(first_page, len(first_page.get("data") or []), page_size):
+        return 1
+    return wanted
+
+
+def _merge_song_pages(first_page: Dict, pages: List[Dict], limit: int, page_size: int) -> Dict:
+    """Append the songs of `pages` (in page order) to the first page, stopping after a short page."""
+    songs = list(first_page.get("data") or [])
+    if len(songs) >= page_size:
+        for page in pages:
+            page_songs = page.get("data") or []
+            songs.extend(page_songs)
+            if len(page_songs) < page_size:
+                break
+    first_page["data"] = songs[:limit]
+    return first_page
+
+
+def _page_params(size: Optional[int] = None, page: Optional[int] = None) -> Dict[str, Any]:
+    """Build JSON:API pagination parameters."""
+    params = {}
+    if size is not None:
+        params["page[size]"] = size
+    if page is not None:
+        params["page[number]"] = page
+    return params
+
+
+def _tags_params(category: Optional[str] = None, size: Optional[int] = None, page: Optional[int] = None) -> Dict[str, Any]:
+    params = {}
+    if category is not None:
+        valid_categories = ["characteristic", "genre", "instrument", "mood"]
+        if category not in valid_categories:
+            raise ValueError(
+                f"Tag category must be one of: {', '.join(valid_categories)}")
+        params["filter[category]"] = category
+    params.update(_page_params(size, page))
+    return params
+
+
+def _sound_effects_params(
+    q: Optional[str] = None,
+    categories: Optional[str] = None,
+    size: Optional[int] = None,
+    page: Optional[int] = None
+) -> Dict[str, Any]:
+    params = {}
+
+    if q is not None:
+        params["filter[q]"] = q
+    if categories is not None:
+        params["filter[categories]"] = categories
+    params.update(_page_params(size, page))
+
+    params["page[size]"] = 100  # TODO static page size
+    return params
+
+
+def _include_params(include: Optional[Any] = None, size: Optional[int] = None, page: Optional[int] = None) -> Dict[str, Any]:
+    params = {}
+    if include is not None:
+        params["include"] = include
+    params.update(_page_params(size, page))
+    return params
+
+
+def _playlists_params(
+    include: Optional[str] = None,
+    include_alternate_audio_files: Optional[bool] = None,
+    playlist_category_ids: Optional[str] = None,
+    media_type: Optional[str] = None,
+    size: Optional[int] = None,
+    page: Optional[int] = None
+) -> Dict[str, Any]:
+    params = {}
+
+    if include is not None:
+        params["include"] = include
+    if include_alternate_audio_files is not None:
+        params["filter[include_alternate_audio_files]"] = include_alternate_audio_files
+    if playlist_category_ids is not None:
+        params["filter[playlist_category_ids]"] = playlist_category_ids
+    if media_type is not None:
+        params["filter[media_type]"] = media_type
+    params.update(_page_params(size, page))
+    return params
+
+
+def _playlist_params(
+    include: Optional[str] = None,
+    include_alternate_audio_files: Optional[bool] = None,
+    size: Optional[int] = None,
+    page: Optional[int] = None,
+    media_type: Optional[str] = None
+) -> Dict[str, Any]:
+    params = {}
+
+    if include is not None:
+        params["include"] = include
+    if include_alternate_audio_files is not None:
+        params["filter[include_alternate_audio_files]"] = include_alternate_audio_files
+    params.update(_page_params(size, page))
+    if media_type is not None:
+        params["filter[media_type]"] = media_type
+    return params
+
+
+def _playlist_categories_by_id(response: Dict) -> Dict:
+    """Transform the response to collect all results into a dict {<id>: <attributes["name"]>}"""
+    result = {}
+    if "data" in response:
+        for item in response["data"]:
+            if "id" in item and "attributes" in item and "name" in item["attributes"]:
+                result[item["id"]] = item["attributes"]["name"]
+
+    return result
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+
+def get_songs(
+    bpm_max: Optional[int] = None,
+    bpm_min: Optional[int] = None,
+    duration_consider_alternate_audio_files: Optional[bool] = None,
+    duration_max: Optional[int] = None,
+    duration_min: Optional[int] = None,
+    energy: Optional[str] = None,
+    include_alternate_audio_files: Optional[bool] = None,
+    instrumental: Optional[bool] = None,
+    q: Optional[str] = None,
+    tags_characteristic: Optional[str] = None,
+    tags_genre: Optional[str] = None,
+    tags_instrument: Optional[str] = None,
+    tags_mood: Optional[str] = None,
+    vocals: Optional[bool] = None,
+    mode: Optional[str] = None,
+    key: Optional[str] = None,
+    page_size: int = MAX_PAGE_SIZE,
+    page: Optional[int] = None,
+    limit: Optional[int] = None,
+    compact: bool = False
+) -> Dict:
+    """
+    Retrieve a list of songs from the Soundstripe API.
+
+    Args:
+        bpm_max: Maximum BPM
+        bpm_min: Minimum BPM
+        duration_consider_alternate_audio_files: If true, songs will be returned if any of their audio files match the supplied duration criteria
+        duration_max: Maximum duration of the song's primary audio file
+        duration_min: Minimum duration of the song's primary audio file
+        energy: Energy to filter by. One of: very_low, low, medium or high
+        include_alternate_audio_files: If true, all audio files for each song will be returned
+        instrumental: If true, only show songs that have at least one instrumental audio file
+        q: Search query
+        tags_characteristic: Comma-separated characteristic tags to filter by
+        tags_genre: Comma-separated genre tags to filter by
+        tags_instrument: Comma-separated instrument tags to filter by
+        tags_mood: Comma-separated mood tags to filter by
+        vocals: If true, only show songs that have at least one vocal audio file
+        mode: Mode to filter by (e.g., major, minor)
+        key: Key to filter by (e.g., C, D, E)
+        page_size: Number of songs per page (1-100, default: 100)
+        page: Page number to retrieve, one-indexed (default: 1)
+        limit: Collect up to this many songs. When more than one page is needed, the
+               first page is fetched to learn the total count, then the remaining pages
+               are fetched in parallel (at most PREFETCH_CONCURRENCY at a time) and
+               merged in page order. Ignored when `page` is given.
+        compact: Request only the fields list views render (SONG_LIST_FIELDS): title,
+                 bpm, duration, tags, artist name/image and primary audio file. Smaller
+                 payloads and faster decoding; leave False for the full song shape.
+
+    Returns:
+        Dict: The API response data
+    """
+    params = _songs_params(
+        bpm_max=bpm_max,
+        bpm_min=bpm_min,
+        duration_consider_alternate_audio_files=duration_consider_alternate_audio_files,
+        duration_max=duration_max,
+        duration_min=duration_min,
+        energy=energy,
+        include_alternate_audio_files=include_alternate_audio_files,
+        instrumental=instrumental,
+        q=q,
+        tags_characteristic=tags_characteristic,
+        tags_genre=tags_genre,
+        tags_instrument=tags_instrument,
+        tags_mood=tags_mood,
+        vocals=vocals,
+        mode=mode,
+        key=key,
+        page_size=page_size,
+        page=page,
+        compact=compact,
+    )
+    response = jsonapi.normalize_songs(_make_request("GET", "songs", params))
+    if limit is None or page is not None:
         return response
 
-    # If there's no included data, it might mean no results found
-    if "included" not in response or not response["included"]:
-        # Return response with empty data if no included data (no results)
-        response["data"] = response.get("data", [])
+    page_size = params["page[size]"]
+    page_count = _pages_to_prefetch(response, limit, page_size)
+    if page_count <= 1:
+        response["data"] = (response.get("data") or [])[:limit]
         return response
-    # Create lookup dictionaries for artists and audio_files
-    artists_lookup = {}
-    audio_files_lookup = {}
-
-    for item in response["included"]:
-        if item["type"] == "artists":
-            # Flatten artist data by removing type and moving attributes to top level
-            artist_data = {"id": item["id"]}
-            if "attributes" in item:
-                artist_data.update(item["attributes"])
-            artists_lookup[item["id"]] = artist_data
-        elif item["type"] == "audio_files":
-            # Flatten audio file data by removing type and moving attributes to top level
-            audio_file_data = {"id": item["id"]}
-            if "attributes" in item:
-                audio_file_data.update(item["attributes"])
-            audio_files_lookup[item["id"]] = audio_file_data
-
-    # Process each song in the data array
-    for song in response["data"]:
-        # Add static type field - overridden for frontend consistency across catalogs
-        song["type"] = "song"
-
-        # Flatten attributes to top level
-        if "attributes" in song:
-            song.update(song["attributes"])
-            del song["attributes"]
-
-        # Inline artist data
-        if "relationships" in song and "artists" in song["relationships"]:
-            artist_data = []
-            for artist_ref in song["relationships"]["artists"]["data"]:
-                artist_id = artist_ref["id"]
-                if artist_id in artists_lookup:
-                    artist_data.append(artists_lookup[artist_id])
-            song["artists"] = artist_data
-
-        # Inline audio files data
-        if "relationships" in song and "audio_files" in song["relationships"]:
-            audio_files_data = []
-            for audio_file_ref in song["relationships"]["audio_files"]["data"]:
-                audio_file_id = audio_file_ref["id"]
-                if audio_file_id in audio_files_lookup:
-                    audio_files_data.append(audio_files_lookup[audio_file_id])
-            song["audio_files"] = audio_files_data
-
-        # Add primary_audio field derived from the first audio file in relationships
-        if "audio_files" in song and len(song["audio_files"]) > 0:
-            # The first audio file listed is the primary audio file
-            primary_audio_file = song["audio_files"][0]
-
-            if "versions" in primary_audio_file:
-                song["primary_audio"] = {}
-                if "mp3" in primary_audio_file["versions"]:
-                    song["primary_audio"]["mp3"] = primary_audio_file["versions"]["mp3"]
-                if "wav" in primary_audio_file["versions"]:
-                    song["primary_audio"]["wav"] = primary_audio_file["versions"]["wav"]
-                # Add duration from the primary audio file
-                if "duration" in primary_audio_file:
-                    song["primary_audio"]["duration_s"] = int(
-                        round(primary_audio_file["duration"]))
-
-        # Remove relationships key after it has been processed
-        if "relationships" in song:
-            del song["relationships"]
-
-    # Remove the included key from the response
-    del response["included"]
-
-    return response
+
+    def fetch_page(number: int) -> Dict:
+        return jsonapi.normalize_songs(
+            _make_request("GET", "songs", {**params, "page[number]": number}))
+
+    numbers = range(2, page_count + 1)
+    with ThreadPoolExecutor(max_workers=min(PREFETCH_CONCURRENCY, len(numbers))) as pool:
+        pages = list(pool.map(fetch_page, numbers))
+    return _merge_song_pages(response, pages, limit, page_size)
+
+
+def iter_song_pages(
+    page_size: int = MAX_PAGE_SIZE,
+    max_pages: Optional[int] = None,
+    **filters: Any
+) -> Generator[List[Dict], None, None]:
+    """
+    Lazily iterate over songs matching `filters`, one page at a time.
+
+    Each page is a separate (separately cached) get_songs call, made only when
+    the consumer asks for the next page.
+
+    Args:
+        page_size: Number of songs per page (1-100)
+        max_pages: Stop after this many pages (default: until the last page)
+        **filters: Any get_songs filter argument (tags_genre, q, bpm_min, ...)
+
+    Yields:
+        List[Dict]: The flattened songs of each page, in page order
+    """
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    page = 1
+    while max_pages is None or page <= max_pages:
+        response = get_songs(page_size=page_size, page=page, **filters)
+        songs = response.get("data") or []
+        if songs:
+            yield songs
+        if not _has_next_page(response, len(songs), page_size):
+            return
+        page += 1
 
 
 def get_song(song_id: str) -> Dict:
@@ -220,87 +552,59 @@ def get_song(song_id: str) -> Dict:
         Dict: The song data
     """
     response = _make_request("GET", f"songs/{song_id}")
+    return jsonapi.normalize_song(response)
+
+
+def _song_cache_keys(song_ids: List[str]) -> Dict[str, str]:
+    """Response cache key of each song's get_song request, by song ID."""
+    return {song_id: response_cache.cache_key("GET", f"songs/{song_id}") for song_id in song_ids}
+
+
+def _cached_songs(keys: Dict[str, str], entries: Dict[str, CachedResponse]) -> Dict[str, Dict]:
+    """Flatten the songs found in the cache (scheduling refreshes of stale ones), by song ID."""
+    policy = response_cache.policy_for("songs")
+    songs = {}
+    for song_id, key in keys.items():
+        entry = entries.get(key)
+        if entry is None:
+            continue
+        _cache_hit("GET", f"songs/{song_id}")
+        if not entry.is_fresh(policy):
+            _schedule_revalidation(f"songs/{song_id}", {}, entry)
+        songs[song_id] = jsonapi.normalize_song(entry.body)
+    return songs
+
 
-    # If there's no included data, raise an exception
-    if "included" not in response or not response["included"]:
-        raise Exception(
-            "Soundstripe API did not return expected format: missing 'included' data")
-
-    # Create lookup dictionaries for artists and audio_files
-    artists_lookup = {}
-    audio_files_lookup = {}
-
-    for item in response["included"]:
-        if item["type"] == "artists":
-            # Flatten artist data by removing type and moving attributes to top level
-            artist_data = {"id": item["id"]}
-            if "attributes" in item:
-                artist_data.update(item["attributes"])
-            artists_lookup[item["id"]] = artist_data
-        elif item["type"] == "audio_files":
-            # Flatten audio file data by removing type and moving attributes to top level
-            audio_file_data = {"id": item["id"]}
-            if "attributes" in item:
-                audio_file_data.update(item["attributes"])
-            audio_files_lookup[item["id"]] = audio_file_data
-
-    # Process the song data
-    song = response["data"]
-
-    # Add static type field - overridden for frontend consistency across catalogs
-    song["type"] = "song"
-
-    # Flatten attributes to top level
-    if "attributes" in song:
-        song.update(song["attributes"])
-        del song["attributes"]
-
-    # Inline artist data
-    if "relationships" in song and "artists" in song["relationships"]:
-        artist_data = []
-        for artist_ref in song["relationships"]["artists"]["data"]:
-            artist_id = artist_ref["id"]
-            if artist_id in artists_lookup:
-                artist_data.append(artists_lookup[artist_id])
-        song["artists"] = artist_data
-
-    # Inline audio files data
-    if "relationships" in song and "audio_files" in song["relationships"]:
-        audio_files_data = []
-        for audio_file_ref in song["relationships"]["audio_files"]["data"]:
-            audio_file_id = audio_file_ref["id"]
-            if audio_file_id in audio_files_lookup:
-                audio_files_data.append(audio_files_lookup[audio_file_id])
-        song["audio_files"] = audio_files_data
-
-    # Add primary_audio field derived from the first audio file in relationships
-    if "audio_files" in song and len(song["audio_files"]) > 0:
-        # The first audio file listed is the primary audio file
-        primary_audio_file = song["audio_files"][0]
-
-        if "versions" in primary_audio_file:
-            song["primary_audio"] = {}
-            if "mp3" in primary_audio_file["versions"]:
-                song["primary_audio"]["mp3"] = primary_audio_file["versions"]["mp3"]
-            if "wav" in primary_audio_file["versions"]:
-                song["primary_audio"]["wav"] = primary_audio_file["versions"]["wav"]
-            # Add duration from the primary audio file
-            if "duration" in primary_audio_file:
-                song["primary_audio"]["duration_s"] = int(
-                    round(primary_audio_file["duration"]))
-
-    # Remove relationships key after it has been processed
-    if "relationships" in song:
-        del song["relationships"]
-
-    # Remove the included key from the response
-    del response["included"]
-
-    # Remove links key and return just the data
-    if "links" in song:
-        del song["links"]
-
-    return song
+def _unique_ids(song_ids: List[str]) -> List[str]:
+    return list(dict.fromkeys(str(song_id) for song_id in song_ids))
+
+
+def get_songs_by_ids(song_ids: List[str]) -> List[Dict]:
+    """
+    Retrieve several songs by ID, in the requested order.
+
+    Songs already in the cache are served from it with one bulk lookup; only
+    the misses are fetched, in parallel (at most PREFETCH_CONCURRENCY at once).
+    The API has no filter-by-IDs query, so each miss is its own get_song call.
+
+    Args:
+        song_ids: The IDs of the songs to retrieve (duplicates are returned once)
+
+    Returns:
+        List[Dict]: The flattened songs, in the order of their first appearance in song_ids
+    """
+    ids = _unique_ids(song_ids)
+    if not ids:
+        return []
+
+    keys = _song_cache_keys(ids)
+    songs = _cached_songs(keys, caches[DEFAULT_CACHE_ALIAS].get_many(list(keys.values())))
+
+    misses = [song_id for song_id in ids if song_id not in songs]
+    if misses:
+        with ThreadPoolExecutor(max_workers=min(PREFETCH_CONCURRENCY, len(misses))) as pool:
+            songs.update(zip(misses, pool.map(get_song, misses)))
+    return [songs[song_id] for song_id in ids]
 
 
 def get_tags(category: Optional[str] = None, size: Optional[int] = None, page: Optional[int] = None) -> Dict:
@@ -315,20 +619,7 @@ def get_tags(category: Optional[str] = None, size: Optional[int] = None, page: O
     Returns:
         Dict: The API response data
     """
-    # Build query parameters
-    params = {}
-    if category is not None:
-        valid_categories = ["characteristic", "genre", "instrument", "mood"]
-        if category not in valid_categories:
-            raise ValueError(
-                f"Tag category must be one of: {', '.join(valid_categories)}")
-        params["filter[category]"] = category
-    if size is not None:
-        params["page[size]"] = size
-    if page is not None:
-        params["page[number]"] = page
-
-    return _make_request("GET", "tags", params)
+    return _make_request("GET", "tags", _tags_params(category, size, page))
 
 
 def get_sound_effects(
@@ -351,55 +642,9 @@ def get_sound_effects(
     Returns:
         Dict: The API response data
     """
-    # Build query parameters
-    params = {}
-
-    if q is not None:
-        params["filter[q]"] = q
-    if categories is not None:
-        params["filter[categories]"] = categories
-    if size is not None:
-        params["page[size]"] = size
-    if page is not None:
-        params["page[number]"] = page
-
-    params["page[size]"] = 100  # TODO static page size
-
+    params = _sound_effects_params(q, categories, size, page)
     response = _make_request("GET", "sound_effects", params)
-
-    # Flatten attributes to top level for each sound effect
-    if "data" in response:
-        for sound_effect in response["data"]:
-            # Add static type field - overridden for frontend consistency across catalogs
-            sound_effect["type"] = "sfx"
-
-            if "attributes" in sound_effect:
-                sound_effect.update(sound_effect["attributes"])
-                del sound_effect["attributes"]
-
-            # Add all_categories field combining categories and subcategories
-            categories_list = sound_effect.get("categories", [])
-            subcategories_list = sound_effect.get("subcategories", [])
-            sound_effect["all_categories"] = categories_list + \
-                subcategories_list
-
-            # Add primary_audio from versions
-            if "versions" in sound_effect:
-                sound_effect["primary_audio"] = {}
-                versions = sound_effect["versions"]
-                if "mp3" in versions:
-                    sound_effect["primary_audio"]["mp3"] = versions["mp3"]
-                if "wav" in versions:
-                    sound_effect["primary_audio"]["wav"] = versions["wav"]
-
-            # Add duration to primary_audio from the top-level duration field
-            if "duration" in sound_effect:
-                if "primary_audio" not in sound_effect:
-                    sound_effect["primary_audio"] = {}
-                sound_effect["primary_audio"]["duration_s"] = int(
-                    round(sound_effect["duration"]))
-
-    return response
+    return jsonapi.normalize_sound_effects(response)
 
 
 def get_sound_effect(sfx_id: str) -> Dict:
@@ -413,44 +658,7 @@ def get_sound_effect(sfx_id: str) -> Dict:
         Dict: The sound effect data as a flat dictionary
     """
     response = _make_request("GET", f"sound_effects/{sfx_id}")
-
-    # Get the sound effect data
-    sound_effect = response.get("data", {})
-
-    # Add static type field - overridden for frontend consistency across catalogs
-    sound_effect["type"] = "sfx"
-
-    # Flatten attributes to top level
-    if "attributes" in sound_effect:
-        sound_effect.update(sound_effect["attributes"])
-        del sound_effect["attributes"]
-
-    # Add all_categories field combining categories and subcategories
-    categories_list = sound_effect.get("categories", [])
-    subcategories_list = sound_effect.get("subcategories", [])
-    sound_effect["all_categories"] = categories_list + subcategories_list
-
-    # Add primary_audio from versions
-    if "versions" in sound_effect:
-        sound_effect["primary_audio"] = {}
-        versions = sound_effect["versions"]
-        if "mp3" in versions:
-            sound_effect["primary_audio"]["mp3"] = versions["mp3"]
-        if "wav" in versions:
-            sound_effect["primary_audio"]["wav"] = versions["wav"]
-
-    # Add duration to primary_audio from the top-level duration field
-    if "duration" in sound_effect:
-        if "primary_audio" not in sound_effect:
-            sound_effect["primary_audio"] = {}
-        sound_effect["primary_audio"]["duration_s"] = int(
-            round(sound_effect["duration"]))
-
-    # Remove links if present
-    if "links" in sound_effect:
-        del sound_effect["links"]
-
-    return sound_effect
+    return jsonapi.normalize_sound_effect(response)
 
 
 def get_categories(include: Optional[List[str]] = None, size: Optional[int] = None, page: Optional[int] = None) -> Dict:
@@ -466,16 +674,7 @@ def get_categories(include: Optional[List[str]] = None, size: Optional[int] = No
     Returns:
         Dict: The API response data
     """
-    # Build query parameters
-    params = {}
-    if include is not None:
-        params["include"] = include
-    if size is not None:
-        params["page[size]"] = size
-    if page is not None:
-        params["page[number]"] = page
-
-    return _make_request("GET", "categories", params)
+    return _make_request("GET", "categories", _include_params(include, size, page))
 
 
 def get_category(category_id: str, include: Optional[str] = None) -> Dict:
@@ -490,12 +689,7 @@ def get_category(category_id: str, include: Optional[str] = None) -> Dict:
     Returns:
         Dict: The API response data
     """
-    # Build query parameters
-    params = {}
-    if include is not None:
-        params["include"] = include
-
-    return _make_request("GET", f"categories/{category_id}", params)
+    return _make_request("GET", f"categories/{category_id}", _include_params(include))
 
 
 def get_playlists(
@@ -529,22 +723,8 @@ def get_playlists(
     Returns:
         Dict: The API response data
     """
-    # Build query parameters
-    params = {}
-
-    if include is not None:
-        params["include"] = include
-    if include_alternate_audio_files is not None:
-        params["filter[include_alternate_audio_files]"] = include_alternate_audio_files
-    if playlist_category_ids is not None:
-        params["filter[playlist_category_ids]"] = playlist_category_ids
-    if media_type is not None:
-        params["filter[media_type]"] = media_type
-    if size is not None:
-        params["page[size]"] = size
-    if page is not None:
-        params["page[number]"] = page
-
+    params = _playlists_params(
+        include, include_alternate_audio_files, playlist_category_ids, media_type, size, page)
     resp = _make_request("GET", "playlists", params)
 
     # TODO count total songs and include in return value
@@ -582,20 +762,8 @@ def get_playlist(
     Returns:
         Dict: The API response data
     """
-    # Build query parameters
-    params = {}
-
-    if include is not None:
-        params["include"] = include
-    if include_alternate_audio_files is not None:
-        params["filter[include_alternate_audio_files]"] = include_alternate_audio_files
-    if size is not None:
-        params["page[size]"] = size
-    if page is not None:
-        params["page[number]"] = page
-    if media_type is not None:
-        params["filter[media_type]"] = media_type
-
+    params = _playlist_params(
+        include, include_alternate_audio_files, size, page, media_type)
     return _make_request("GET", f"playlists/{playlist_id}", params)
 
 
@@ -610,23 +778,8 @@ def get_playlist_categories(size: Optional[int] = None, page: Optional[int] = No
     Returns:
         Dict: The API response data with {<id>: <attributes["name"]>} format
     """
-    # Build query parameters
-    params = {}
-    if size is not None:
-        params["page[size]"] = size
-    if page is not None:
-        params["page[number]"] = page
-
-    response = _make_request("GET", "playlist_categories", params)
-
-    # Transform the response to collect all results into a dict {<id>: <attributes["name"]>}
-    result = {}
-    if "data" in response:
-        for item in response["data"]:
-            if "id" in item and "attributes" in item and "name" in item["attributes"]:
-                result[item["id"]] = item["attributes"]["name"]
-
-    return result
+    response = _make_request("GET", "playlist_categories", _page_params(size, page))
+    return _playlist_categories_by_id(response)
 
 
 def get_playlist_category(playlist_category_id: str) -> Dict:
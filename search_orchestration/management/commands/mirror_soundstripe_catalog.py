@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from search_orchestration.catalog import MIRRORED_RESOURCES, MirrorReport, mirror_resource
+from search_orchestration.clients.soundstripe_client import MAX_PAGE_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Mirror the Soundstripe catalog (songs, tags, sound effects, categories, playlists) "
+        "into local tables. Meant to run nightly; resumes an interrupted run by default."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "resources",
+            nargs="*",
+            choices=MIRRORED_RESOURCES,
+            help="Resources to mirror (default: all).",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=MAX_PAGE_SIZE,
+            help=f"Records per API page, 1-{MAX_PAGE_SIZE} (default: {MAX_PAGE_SIZE}).",
+        )
+        parser.add_argument(
+            "--max-pages",
+            type=int,
+            default=None,
+            help="Stop each resource after this many pages; the next run resumes from there.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore any saved cursor and walk every resource from page 1.",
+        )
+
+    def handle(self, *args, **options):
+        resources = options["resources"] or MIRRORED_RESOURCES
+        total_records = 0
+        total_seconds = 0.0
+
+        for resource in resources:
+            try:
+                report = mirror_resource(
+                    resource,
+                    page_size=options["page_size"],
+                    restart=options["restart"],
+                    max_pages=options["max_pages"],
+                    on_page=self._log_page if options["verbosity"] > 1 else None,
+                )
+            except Exception as e:
+                raise CommandError(f"Mirroring {resource} failed: {e}") from e
+
+            total_records += report.records
+            total_seconds += report.seconds
+            self._log_report(report)
+
+        rate = total_records / total_seconds if total_seconds else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Mirrored {total_records} records in {total_seconds:.1f}s ({rate:.1f} records/s)"))
+
+    def _log_page(self, report: MirrorReport):
+        self.stdout.write(
+            f"  {report.resource}: page {report.resumed_from_page + report.pages - 1}, "
+            f"{report.records} records, {report.records_per_second:.1f} records/s")
+
+    def _log_report(self, report: MirrorReport):
+        status = "complete" if report.completed else "partial (will resume)"
+        resumed = f", resumed at page {report.resumed_from_page}" if report.resumed_from_page > 1 else ""
+        pruned = f", pruned {report.pruned} stale" if report.pruned else ""
+        self.stdout.write(
+            f"{report.resource}: {status}{resumed} - {report.records} records in {report.pages} pages, "
+            f"{report.seconds:.1f}s ({report.records_per_second:.1f} records/s, "
+            f"{report.pages_per_second:.2f} pages/s){pruned}")
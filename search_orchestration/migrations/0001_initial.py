@@ -0,0 +1,41 @@
+# Generated by Django 5.1.3 on 2026-10-17 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(choices=[('songs', 'Songs'), ('tags', 'Tags'), ('sound_effects', 'Sound effects'), ('categories', 'Categories'), ('playlists', 'Playlists')], max_length=32, unique=True)),
+                ('next_page', models.PositiveIntegerField(default=1)),
+                ('page_size', models.PositiveIntegerField(default=100)),
+                ('records_synced', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CatalogRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(choices=[('songs', 'Songs'), ('tags', 'Tags'), ('sound_effects', 'Sound effects'), ('categories', 'Categories'), ('playlists', 'Playlists')], max_length=32)),
+                ('external_id', models.CharField(max_length=64)),
+                ('data', models.JSONField()),
+                ('synced_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['resource', 'synced_at'], name='search_orch_resourc_4c25bb_idx')],
+                'constraints': [models.UniqueConstraint(fields=('resource', 'external_id'), name='unique_catalog_record')],
+            },
+        ),
+    ]
@@ -1,3 +1,52 @@
 from django.db import models
 
 # Create your models here.
+
+CATALOG_RESOURCES = [
+    ('songs', 'Songs'),
+    ('tags', 'Tags'),
+    ('sound_effects', 'Sound effects'),
+    ('categories', 'Categories'),
+    ('playlists', 'Playlists'),
+]
+
+
+class CatalogRecord(models.Model):
+    """One Soundstripe resource mirrored locally, stored in the shape the client returns it."""
+    resource = models.CharField(max_length=32, choices=CATALOG_RESOURCES)
+    external_id = models.CharField(max_length=64)
+    data = models.JSONField()
+    synced_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['resource', 'external_id'], name='unique_catalog_record'),
+        ]
+        indexes = [
+            models.Index(fields=['resource', 'synced_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.resource}/{self.external_id}"
+
+
+class CatalogSyncState(models.Model):
+    """Pagination cursor for mirroring one resource, so an interrupted run can resume."""
+    resource = models.CharField(
+        max_length=32, choices=CATALOG_RESOURCES, unique=True)
+    next_page = models.PositiveIntegerField(default=1)
+    page_size = models.PositiveIntegerField(default=100)
+    records_synced = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    # End of the most recent complete walk; kept while a new run is in progress
+    last_completed_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def in_progress(self):
+        return self.started_at is not None and self.completed_at is None
+
+    def __str__(self):
+        status = 'in progress' if self.in_progress else 'idle'
+        return f"{self.resource} ({status}, next page {self.next_page})"
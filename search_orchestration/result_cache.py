@@ -0,0 +1,199 @@
+"""
+Query-containment cache for live song searches.
+
+The broadening loop and the tag-search UI often run a search whose filters are
+a superset of one already answered: Cinematic + Piano right after Cinematic.
+The response cache only helps when the request is byte-for-byte the same
+(after canonicalization), so the narrower search would go upstream again.
+
+This cache keeps recent live results keyed by their SearchFilter. A filter
+`A` contains `B` when every song matching B also matches A:
+
+  * terms within a tag category are ORed and categories are ANDed (as in the
+    catalog index), so for every category A constrains, B must constrain it
+    with a subset of A's terms; B may add categories A leaves open,
+  * B's bpm / duration ranges must lie inside A's,
+  * the free-text query must be the same (it also matches text the compact
+    songs do not carry, so it cannot be checked locally).
+
+A contained search is answered by filtering the cached songs on their tags,
+bpm and duration, in the cached order. That is only exact when the cached
+result held every match, so entries filled up to the requested count are
+marked truncated and only answer the identical filter.
+
+Per process and in memory: entries hold compact Song objects, which are
+shared with callers and must be treated as read-only.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from environs import Env
+
+from search_orchestration.songs import SONG_TAG_CATEGORIES, Song
+
+env = Env()
+env.read_env()
+
+RESULT_CACHE_ENABLED = env.bool("SEARCH_RESULT_CACHE", True)
+RESULT_CACHE_MAX_ENTRIES = env.int("SEARCH_RESULT_CACHE_MAX_ENTRIES", 256)
+# Seconds an entry may answer searches (kept well inside the songs response cache freshness)
+RESULT_CACHE_TTL = env.float("SEARCH_RESULT_CACHE_TTL", 600.0)
+
+Range = Tuple[Optional[float], Optional[float]]
+
+
+def _normalize(term: str) -> str:
+    return term.strip().casefold()
+
+
+def _range_within(inner: Range, outer: Range) -> bool:
+    """Whether every value allowed by `inner` is allowed by `outer`."""
+    (inner_min, inner_max), (outer_min, outer_max) = inner, outer
+    if outer_min is not None and (inner_min is None or inner_min < outer_min):
+        return False
+    if outer_max is not None and (inner_max is None or inner_max > outer_max):
+        return False
+    return True
+
+
+def _in_range(value: Optional[float], bounds: Range) -> bool:
+    low, high = bounds
+    if low is None and high is None:
+        return True
+    if value is None:
+        return False
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+@dataclass(frozen=True)
+class SearchFilter:
+    """The filters of one song search, normalized for containment checks."""
+    # (category, terms) for each constrained category, in SONG_TAG_CATEGORIES order
+    tags: Tuple[Tuple[str, FrozenSet[str]], ...] = ()
+    q: str = ""
+    bpm: Range = (None, None)
+    duration: Range = (None, None)
+
+    @classmethod
+    def of(
+        cls,
+        selection: Dict[str, List[str]],
+        *,
+        q: Optional[str] = None,
+        bpm_min: Optional[float] = None,
+        bpm_max: Optional[float] = None,
+        duration_min: Optional[float] = None,
+        duration_max: Optional[float] = None,
+    ) -> "SearchFilter":
+        tags = []
+        for category in SONG_TAG_CATEGORIES:
+            terms = frozenset(_normalize(t) for t in (selection.get(category) or []) if t and t.strip())
+            if terms:
+                tags.append((category, terms))
+        return cls(
+            tags=tuple(tags),
+            q=" ".join((q or "").split()),
+            bpm=(bpm_min, bpm_max),
+            duration=(duration_min, duration_max),
+        )
+
+    def contains(self, other: "SearchFilter") -> bool:
+        """Whether every song matching `other` also matches this filter."""
+        if self.q != other.q:
+            return False
+        if not (_range_within(other.bpm, self.bpm) and _range_within(other.duration, self.duration)):
+            return False
+        other_tags = dict(other.tags)
+        return all(
+            category in other_tags and other_tags[category] <= terms
+            for category, terms in self.tags
+        )
+
+    def matches(self, song: Song) -> bool:
+        """Whether a song passes the tag, bpm and duration filters (q is not checked)."""
+        for category, terms in self.tags:
+            if not any(_normalize(term) in terms for term in song.tags_for(category)):
+                return False
+        duration = song.primary_audio.duration_s if song.primary_audio else None
+        if duration is None:
+            duration = song.duration
+        return _in_range(song.bpm, self.bpm) and _in_range(duration, self.duration)
+
+
+@dataclass
+class _Entry:
+    songs: List[Song]
+    # True when the search returned fewer songs than requested, i.e. every match
+    complete: bool
+    stored_at: float
+
+
+class ContainmentCache:
+    """Bounded LRU of search results that also answers contained (narrower) searches."""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES, ttl: float = RESULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[SearchFilter, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.contained_hits = 0
+        self.misses = 0
+
+    def get(self, search: SearchFilter, limit: int) -> Optional[List[Song]]:
+        """
+        Up to `limit` songs for `search` from a cached equal or broader search,
+        or None when no cached result can answer it exactly.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for cached, entry in self._candidates(search, now):
+                if cached == search and (entry.complete or len(entry.songs) >= limit):
+                    self._entries.move_to_end(cached)
+                    self.hits += 1
+                    return entry.songs[:limit]
+                if entry.complete:
+                    self._entries.move_to_end(cached)
+                    self.contained_hits += 1
+                    break
+            else:
+                self.misses += 1
+                return None
+
+        songs: List[Song] = []
+        for song in entry.songs:
+            if search.matches(song):
+                songs.append(song)
+                if len(songs) >= limit:
+                    break
+        return songs
+
+    def _candidates(self, search: SearchFilter, now: float):
+        """Unexpired entries containing `search`: the exact entry first, then newest first."""
+        exact = self._entries.get(search)
+        if exact is not None and now - exact.stored_at < self.ttl:
+            yield search, exact
+        for cached, entry in reversed(list(self._entries.items())):
+            if cached != search and now - entry.stored_at < self.ttl and cached.contains(search):
+                yield cached, entry
+
+    def put(self, search: SearchFilter, songs: List[Song], requested: int) -> None:
+        """Store the result of a search that asked for `requested` songs."""
+        entry = _Entry(songs=list(songs), complete=len(songs) < requested, stored_at=time.monotonic())
+        with self._lock:
+            self._entries[search] = entry
+            self._entries.move_to_end(search)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+result_cache = ContainmentCache()
@@ -0,0 +1,133 @@
+"""
+Compact in-memory representation of search results.
+
+A flattened Soundstripe song is a nested dict tree: every audio file with all
+its versions, and a private copy of each artist dict. Search keeps those trees
+in SearchState["results"] for the whole graph run and the local catalog index
+keeps one per mirrored song. Song holds only what search and the UI use, in
+__slots__ classes:
+
+  * artists are interned, so every song by the same artist shares one Artist,
+  * tag terms are interned strings held in tuples,
+  * only the primary audio file's mp3/wav/duration is kept; the full song
+    (all audio files and versions) is fetched on demand with Song.details().
+
+Song.to_context_item() produces exactly the song_to_context_item shape.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from search_orchestration.clients.soundstripe_client import get_song
+
+# Order of Song.tags (and of the "tags" dict in context items)
+SONG_TAG_CATEGORIES: Tuple[str, ...] = ("genre", "mood", "instrument", "characteristic")
+_TAG_POSITION = {category: i for i, category in enumerate(SONG_TAG_CATEGORIES)}
+
+
+def format_duration(seconds: Optional[int]) -> str:
+    """Format seconds as M:SS for display."""
+    if seconds is None or seconds < 0:
+        return ""
+    m, s = divmod(int(seconds), 60)
+    return f"{m}:{s:02d}"
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class Artist:
+    name: str
+    image: str
+
+    def to_context_item(self) -> Dict[str, str]:
+        return {"name": self.name, "image": self.image}
+
+
+_artists: "weakref.WeakValueDictionary[Tuple[str, str], Artist]" = weakref.WeakValueDictionary()
+_artists_lock = threading.Lock()
+
+
+def intern_artist(name: Optional[str], image: Optional[str]) -> Artist:
+    """The shared Artist for (name, image), created on first use."""
+    key = (name or "", image or "")
+    with _artists_lock:
+        artist = _artists.get(key)
+        if artist is None:
+            artist = Artist(_intern(key[0]), _intern(key[1]))
+            _artists[key] = artist
+        return artist
+
+
+@dataclass(frozen=True, slots=True)
+class AudioFile:
+    """The primary audio file: playable versions and duration only."""
+    mp3: Optional[str] = None
+    wav: Optional[str] = None
+    duration_s: Optional[int] = None
+
+
+@dataclass(slots=True)
+class Song:
+    id: str
+    title: Optional[str]
+    bpm: Optional[int]
+    duration: Optional[float]
+    artists: Tuple[Artist, ...]
+    # One tuple of terms per SONG_TAG_CATEGORIES entry
+    tags: Tuple[Tuple[str, ...], ...]
+    primary_audio: Optional[AudioFile]
+
+    @classmethod
+    def from_dict(cls, song: Dict[str, Any]) -> "Song":
+        """Build from a flattened song dict (client, mirror or index shape)."""
+        raw_tags = song.get("tags") or {}
+        primary = song.get("primary_audio")
+        return cls(
+            id=str(song.get("id")),
+            title=song.get("title"),
+            bpm=song.get("bpm"),
+            duration=song.get("duration"),
+            artists=tuple(
+                intern_artist(a.get("name"), a.get("image")) for a in (song.get("artists") or [])),
+            tags=tuple(
+                tuple(_intern(term) for term in (raw_tags.get(category) or []))
+                for category in SONG_TAG_CATEGORIES
+            ),
+            primary_audio=AudioFile(
+                mp3=primary.get("mp3"),
+                wav=primary.get("wav"),
+                duration_s=primary.get("duration_s"),
+            ) if primary else None,
+        )
+
+    def tags_for(self, category: str) -> Tuple[str, ...]:
+        position = _TAG_POSITION.get(category)
+        return () if position is None else self.tags[position]
+
+    def to_context_item(self) -> Dict[str, Any]:
+        """Serializable dict for UI (the song_to_context_item shape)."""
+        primary = self.primary_audio or AudioFile()
+        return {
+            "id": self.id,
+            "title": self.title or f"Track (id: {self.id})",
+            "artists": [artist.to_context_item() for artist in self.artists],
+            "primary_audio_mp3": primary.mp3 or "",
+            "tags": {category: list(terms) for category, terms in zip(SONG_TAG_CATEGORIES, self.tags)},
+            "duration_display": format_duration(primary.duration_s or self.duration),
+            "bpm": self.bpm,
+        }
+
+    def details(self) -> Dict[str, Any]:
+        """The full flattened song (all audio files and versions), fetched on demand."""
+        return get_song(self.id)
+
+
+def compact_songs(songs: Iterable[Dict[str, Any]]) -> List[Song]:
+    return [Song.from_dict(song) for song in songs]
@@ -1,3 +1,319 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+import httpx
+from django.test import SimpleTestCase
+
+from search_orchestration.adapters import soundstripe_adapter
+from search_orchestration.clients import resilience
+from search_orchestration.clients.replay import RecordingTransport, ReplayTransport
+from search_orchestration.clients.request_keys import canonical_params
+from search_orchestration.clients.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HedgeBudget,
+    LatencyTracker,
+    _backoff,
+)
+from search_orchestration.result_cache import ContainmentCache, SearchFilter, result_cache
+from search_orchestration.songs import Song
+
+
+class ReplayTransportTests(SimpleTestCase):
+    def setUp(self):
+        self.cassette_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cassette_dir, True)
+
+    def _upstream(self, request):
+        if request.headers.get("if-none-match") == "v1":
+            return httpx.Response(304, headers={"etag": "v1"})
+        return httpx.Response(200, json={"data": [{"id": "1"}]}, headers={"etag": "v1"})
+
+    def test_revalidation_does_not_overwrite_recorded_body(self):
+        recorder = httpx.Client(transport=RecordingTransport(
+            self.cassette_dir, transport=httpx.MockTransport(self._upstream)))
+        url = "https://api.example.com/v1/tags"
+        params = {"filter[category]": "mood"}
+        self.assertEqual(recorder.get(url, params=params).status_code, 200)
+        self.assertEqual(
+            recorder.get(url, params=params, headers={"If-None-Match": "v1"}).status_code, 304)
+
+        replay = httpx.Client(transport=ReplayTransport(self.cassette_dir))
+        response = replay.get(url, params=params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"data": [{"id": "1"}]})
+
+
+class CanonicalParamsTests(SimpleTestCase):
+    def test_list_values_are_comma_joined(self):
+        self.assertEqual(canonical_params({"include": ["subcategories"]}), {"include": "subcategories"})
+        self.assertEqual(
+            canonical_params({"include": ["subcategories", "other", "other"]}),
+            {"include": "other,subcategories"},
+        )
+        self.assertEqual(
+            canonical_params({"include": ("b", "a")}), canonical_params({"include": "a,b"}))
+
+    def test_equivalent_forms_share_a_key(self):
+        self.assertEqual(
+            canonical_params({"filter[tags][genre]": "Rock, Pop", "page[number]": 1, "filter[vocals]": True}),
+            {"filter[tags][genre]": "Pop,Rock", "filter[vocals]": "true"},
+        )
+        self.assertEqual(canonical_params({"filter[q]": "  chill   lofi "}), {"filter[q]": "chill lofi"})
+
+
+def make_song(song_id, genre=(), mood=(), bpm=None):
+    return Song.from_dict({"id": song_id, "title": f"Song {song_id}", "bpm": bpm,
+                           "tags": {"genre": list(genre), "mood": list(mood)}})
+
+
+class SearchPagingTests(SimpleTestCase):
+    def setUp(self):
+        result_cache.clear()
+        self.addCleanup(result_cache.clear)
+        patcher = mock.patch.object(soundstripe_adapter, "search_local_catalog", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_later_pages_come_from_the_cached_entry_that_answered_page_one(self):
+        songs = [make_song(str(i), genre=["Cinematic"], mood=["Hopeful"] if i % 3 == 0 else []) for i in range(30)]
+        result_cache.put(SearchFilter.of({"genre": ["Cinematic"]}), songs, requested=100)
+        narrow = {"genre": ["Cinematic"], "mood": ["Hopeful"]}
+
+        with mock.patch.object(soundstripe_adapter, "get_songs", side_effect=AssertionError("went upstream")):
+            pages = [
+                [song.id for song in soundstripe_adapter.soundstripe_search(narrow, page_size=4, page=page)]
+                for page in (1, 2, 3)
+            ]
+        self.assertEqual(pages, [["0", "3", "6", "9"], ["12", "15", "18", "21"], ["24", "27"]])
+
+    def test_later_pages_go_upstream_without_a_long_enough_entry(self):
+        songs = [make_song(str(i), genre=["Cinematic"]) for i in range(4)]
+        result_cache.put(SearchFilter.of({"genre": ["Cinematic"]}), songs, requested=4)
+
+        upstream = {"data": [{"id": "u1"}, {"id": "u2"}]}
+        with mock.patch.object(soundstripe_adapter, "get_songs", return_value=upstream) as get_songs:
+            page = soundstripe_adapter.soundstripe_search({"genre": ["Cinematic"]}, page_size=4, page=2)
+        self.assertEqual([song.id for song in page], ["u1", "u2"])
+        self.assertEqual(get_songs.call_args.kwargs["page"], 2)
+
+
+class ContainmentCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = ContainmentCache(max_entries=8, ttl=60)
+        self.songs = [
+            make_song("1", genre=["Cinematic"], mood=["Hopeful"], bpm=90),
+            make_song("2", genre=["Cinematic"], mood=["Dark"], bpm=120),
+            make_song("3", genre=["Cinematic"], mood=["Hopeful"], bpm=140),
+        ]
+
+    def test_contains(self):
+        broad = SearchFilter.of({"genre": ["Cinematic", "Ambient"]}, bpm_min=80)
+        self.assertTrue(broad.contains(SearchFilter.of({"genre": ["cinematic"], "mood": ["Hopeful"]}, bpm_min=100)))
+        # narrower on a category the broad filter leaves open, but a wider bpm range
+        self.assertFalse(broad.contains(SearchFilter.of({"genre": ["Cinematic"]})))
+        # a term outside the broad filter's terms
+        self.assertFalse(broad.contains(SearchFilter.of({"genre": ["Rock"]}, bpm_min=80)))
+        # no constraint on a category the broad filter constrains
+        self.assertFalse(broad.contains(SearchFilter.of({"mood": ["Hopeful"]}, bpm_min=80)))
+        # free text must be identical
+        self.assertFalse(
+            SearchFilter.of({"genre": ["Cinematic"]}, q="piano").contains(
+                SearchFilter.of({"genre": ["Cinematic"]}, q="piano solo")))
+
+    def test_contained_search_is_answered_from_a_complete_entry(self):
+        self.cache.put(SearchFilter.of({"genre": ["Cinematic"]}), self.songs, requested=10)
+        narrow = SearchFilter.of({"genre": ["Cinematic"], "mood": ["Hopeful"]}, bpm_max=100)
+        self.assertEqual([song.id for song in self.cache.get(narrow, 10)], ["1"])
+        self.assertEqual(self.cache.contained_hits, 1)
+
+    def test_truncated_entry_only_answers_the_identical_search(self):
+        broad = SearchFilter.of({"genre": ["Cinematic"]})
+        self.cache.put(broad, self.songs, requested=3)
+        # other matches may exist past the truncated result
+        self.assertIsNone(self.cache.get(SearchFilter.of({"genre": ["Cinematic"], "mood": ["Hopeful"]}), 10))
+        self.assertEqual([song.id for song in self.cache.get(broad, 2)], ["1", "2"])
+        # asks for more than the entry holds
+        self.assertIsNone(self.cache.get(broad, 5))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_expired_and_evicted_entries_miss(self):
+        search = SearchFilter.of({"genre": ["Cinematic"]})
+        expiring = ContainmentCache(max_entries=1, ttl=0)
+        expiring.put(search, self.songs, requested=10)
+        self.assertIsNone(expiring.get(search, 1))
+
+        self.cache.max_entries = 1
+        self.cache.put(search, self.songs, requested=10)
+        self.cache.put(SearchFilter.of({"mood": ["Dark"]}), self.songs[1:2], requested=10)
+        self.assertIsNone(self.cache.get(search, 1))
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_half_opens_and_closes(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, "half-open")
+        breaker.before_request()  # the trial request
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()  # others wait for the trial
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        breaker.before_request()
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        breaker.before_request()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+
+
+class ResilienceTestCase(SimpleTestCase):
+    """Fresh breaker, latency samples and hedge budget for every test."""
+
+    def setUp(self):
+        for name, value in (
+            ("breaker", CircuitBreaker(failure_threshold=10, reset_timeout=60)),
+            ("latency", LatencyTracker()),
+            ("hedge_budget", HedgeBudget(ratio=0.1, burst=10)),
+            ("_backoff", lambda attempt, response: 0.0),
+        ):
+            patcher = mock.patch.object(resilience, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def request_for(self, handler):
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        self.addCleanup(client.close)
+        return lambda timeout: client.get("https://api.example.com/v1/songs", timeout=timeout)
+
+
+class RetryTests(ResilienceTestCase):
+    def test_retries_retryable_statuses_then_succeeds(self):
+        statuses = iter([503, 429, 200])
+        response = resilience.send("songs", self.request_for(lambda request: httpx.Response(next(statuses))))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(resilience.breaker.state, "closed")
+
+    def test_returns_last_failure_once_retries_are_exhausted(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(502)
+
+        response = resilience.send("songs", self.request_for(handler))
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(len(calls), resilience.MAX_RETRIES + 1)
+
+    def test_retries_transport_errors(self):
+        outcomes = iter([httpx.ConnectError("refused"), httpx.Response(200)])
+
+        def handler(request):
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        self.assertEqual(resilience.send("songs", self.request_for(handler)).status_code, 200)
+
+    def test_does_not_retry_client_errors(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(404)
+
+        self.assertEqual(resilience.send("songs", self.request_for(handler)).status_code, 404)
+        self.assertEqual(len(calls), 1)
+
+    def test_backoff_honours_retry_after(self):
+        response = httpx.Response(429, headers={"Retry-After": "2"})
+        self.assertEqual(_backoff(0, response), 2.0)
+        self.assertLessEqual(_backoff(3, None), resilience.BACKOFF_MAX)
+
+
+class HedgeTests(ResilienceTestCase):
+    def setUp(self):
+        super().setUp()
+        for _ in range(resilience.HEDGE_MIN_SAMPLES):
+            resilience.latency.record("songs", 0.01)
+        self.slots = threading.BoundedSemaphore(1)
+        patcher = mock.patch.object(resilience, "_hedge_slots", self.slots)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Released by each test; lets a slow primary (the hedge's loser) finish
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def slow_first(self):
+        calls = []
+
+        def handler(request):
+            calls.append(threading.current_thread().name)
+            if len(calls) == 1:
+                self.release.wait(5)
+                return httpx.Response(200, json={"from": "primary"})
+            return httpx.Response(200, json={"from": "hedge"})
+
+        return calls, handler
+
+    def test_hedge_wins_over_slow_primary_and_frees_its_slot_after_the_loser(self):
+        calls, handler = self.slow_first()
+        started = time.perf_counter()
+        response = resilience.send("songs", self.request_for(handler))
+        self.assertEqual(response.json(), {"from": "hedge"})
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(len(calls), 2)
+
+        # The loser still holds the slot, so the next request runs on this thread
+        self.assertFalse(self.slots.acquire(blocking=False))
+        threads = []
+        resilience.send("songs", self.request_for(
+            lambda request: threads.append(threading.current_thread().name) or httpx.Response(200)))
+        self.assertEqual(threads, [threading.current_thread().name])
+
+        self.release.set()
+        for _ in range(100):
+            if self.slots.acquire(blocking=False):
+                break
+            time.sleep(0.01)
+        else:
+            self.fail("hedge slot was not released after the loser finished")
+
+    def test_fast_primary_is_not_hedged(self):
+        calls = []
+        resilience.send("songs", self.request_for(lambda request: calls.append(request) or httpx.Response(200)))
+        self.assertEqual(len(calls), 1)
+
+    def test_no_hedge_once_the_budget_is_spent(self):
+        resilience.hedge_budget = HedgeBudget(ratio=0.0, burst=1)
+        self.assertTrue(resilience.hedge_budget.try_spend())
+        calls, handler = self.slow_first()
+        threading.Timer(0.2, self.release.set).start()
+        response = resilience.send("songs", self.request_for(handler))
+        self.assertEqual(response.json(), {"from": "primary"})
+        self.assertEqual(calls, [threading.current_thread().name])
+
+    def test_budget_refills_with_requests(self):
+        budget = HedgeBudget(ratio=0.5, burst=1)
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+        budget.earn()
+        self.assertFalse(budget.available())
+        budget.earn()
+        self.assertTrue(budget.try_spend())
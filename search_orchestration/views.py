@@ -9,21 +9,40 @@ from search_orchestration.adapters.ai import (
 )
 from search_orchestration.adapters.ai.utils import decode_unicode
 from search_orchestration.adapters.soundstripe_adapter import soundstripe_search
+from search_orchestration.clients.soundstripe_client import MAX_PAGE_SIZE
 
 from search_orchestration.adapters.ai.taxonomy import MUSIC_TAXONOMY
 
+# Songs in the tag search's first response: one small page paints fastest
+TAG_SEARCH_PAGE_SIZE = 12
+
 
 @login_required
 def search_tags_view(request):
     """
-    Tag-based search: GET params q (optional), genre, mood, instrument, characteristic (multiple).
-    Returns JSON: { "items": [...], "active_filters": { genre: [], mood: [], ... } }.
+    Tag-based search: GET params q (optional), genre, mood, instrument, characteristic (multiple),
+    page_size (optional, default TAG_SEARCH_PAGE_SIZE, at most 100), page (optional, default 1).
+    Returns JSON: { "items": [...], "active_filters": { genre: [], mood: [], ... },
+    "page": n, "has_more": bool }; the UI fetches page n + 1 while has_more is true.
+    Sync on purpose: the app is served over WSGI (gunicorn), where an async view
+    runs on a new event loop per request and would get a new, never-closed
+    async HTTP client each time instead of the pooled sync one. Switch to
+    asoundstripe_search once it is served over ASGI.
     """
     q = (request.GET.get("q") or "").strip()
     genre = request.GET.getlist("genre")
     mood = request.GET.getlist("mood")
     instrument = request.GET.getlist("instrument")
     characteristic = request.GET.getlist("characteristic")
+    try:
+        page_size = int(request.GET.get("page_size") or TAG_SEARCH_PAGE_SIZE)
+    except ValueError:
+        page_size = TAG_SEARCH_PAGE_SIZE
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    try:
+        page = max(1, int(request.GET.get("page") or 1))
+    except ValueError:
+        page = 1
 
     selection = {}
     if genre:
@@ -43,7 +62,7 @@ def search_tags_view(request):
         )
 
     try:
-        songs = soundstripe_search(selection, q=q or None)
+        songs = soundstripe_search(selection, q=q or None, page_size=page_size, page=page)
         print('songs from soundstripe_search', songs)
     except Exception as e:
         return JsonResponse(
@@ -53,7 +72,12 @@ def search_tags_view(request):
 
     items = [song_to_context_item(s) for s in songs]
     active_filters = selection
-    return JsonResponse({"items": items, "active_filters": active_filters})
+    return JsonResponse({
+        "items": items,
+        "active_filters": active_filters,
+        "page": page,
+        "has_more": len(items) == page_size,
+    })
 
 
 @login_required